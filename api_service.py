@@ -1,40 +1,337 @@
 import time
 import json
 import os
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from order import Order
+from order_shards import OrderShards
+from order_snapshot import LazyOrderList, OrderSnapshot, write_snapshot
+
+try:
+    import fcntl
+except ImportError:  # Windows: only in-process locking
+    fcntl = None
+
+# Simulated network latency per call, in seconds
+LATENCY = {
+    "get_orders": 0.2,
+    "update_order_status": 0.3,
+    "add_order": 0.5,
+    "add_orders": 0.5,
+    "delete_order": 0.3,
+    "get_orders_changed_since": 0.1,
+    "get_summary": 0.05,
+}
+# Orders copied per read transaction by iter_orders
+ITER_PAGE_SIZE = 500
+
+
+def filter_orders(orders, date=None, status=None, search_term=None):
+    """Filter and sort orders the same way the API does."""
+    filtered_orders = list(orders)
+
+    if date:
+        filtered_orders = [order for order in filtered_orders if order.date == date]
+
+    if status:
+        filtered_orders = [order for order in filtered_orders if order.status == status]
+
+    if search_term:
+        search_term = search_term.lower()
+        filtered_orders = [
+            order for order in filtered_orders
+            if (search_term in order.order_number.lower() or
+                search_term in order.customer_name.lower() or
+                search_term in order.title.lower())
+        ]
+
+    # Sort by date and ID
+    filtered_orders.sort(key=lambda x: (x.date, x.id), reverse=True)
+
+    return filtered_orders
+
+
+def write_json_records(f, records):
+    """Write records as an indented JSON array, one record at a time."""
+    f.write("[")
+    first = True
+    for record in records:
+        f.write("\n  " if first else ",\n  ")
+        f.write(json.dumps(record, indent=2).replace("\n", "\n  "))
+        first = False
+    f.write("\n]" if not first else "]")
+
+
+def iter_from(orders, start):
+    """Yield a list's (or ``LazyOrderList``'s) orders from a position on."""
+    if isinstance(orders, LazyOrderList):
+        return orders.iter_orders(start)
+    return (orders[position] for position in range(start, len(orders)))
+
+
+def resume_position(orders, position, last_id):
+    """Where to carry on after the order ``last_id``, which was at ``position - 1``."""
+    if 0 < position <= len(orders) and orders[position - 1].id == last_id:
+        return position
+    # Orders were added or deleted before it since; find it again by id
+    if isinstance(orders, LazyOrderList):
+        index = orders.index_of_id(last_id)
+    else:
+        index = next((i for i, order in enumerate(orders) if order.id == last_id), None)
+    if index is not None:
+        return index + 1
+    # It was deleted; ids grow as orders are added, so go on from the next higher one
+    return next((i for i, order in enumerate(iter_from(orders, 0)) if order.id > last_id), len(orders))
+
 
 class APIService:
     """Simulates API calls to an external service."""
     
-    def __init__(self):
-        """Initialize the API service with sample data."""
+    def __init__(self, columnar=False, snapshot=False, sharded=False, hot_days=7, simulate_latency=True):
+        """Initialize the API service with sample data.
+
+        With ``columnar=True`` orders are held in a NumPy-backed
+        ``OrderTable`` instead of a list of ``Order`` records (needs numpy).
+        With ``snapshot=True`` a binary snapshot is kept next to the JSON
+        file and opened lazily at startup while it is up to date.
+        With ``sharded=True`` orders live in per-day files under ``orders/``
+        (imported once from the JSON file), with days older than
+        ``hot_days`` archived to compressed files; this replaces the other
+        storage modes.
+
+        Several processes can share the same files: every call runs in a
+        ``transaction`` that holds an in-process lock and an ``fcntl`` lock
+        on ``api_data.lock``, and reloads the data first when another
+        process has written since this one last looked.
+
+        ``simulate_latency=False`` drops the fake network delays, for when
+        the service runs behind a real server (see ``order_server``).
+        """
         self.data_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "api_data.json")
-        self.load_data()
+        self.snapshot_file = os.path.splitext(self.data_file)[0] + ".snap"
+        self.meta_file = os.path.splitext(self.data_file)[0] + ".meta.json"
+        self.lock_file = os.path.splitext(self.data_file)[0] + ".lock"
+        self.lock = threading.RLock()
+        self.lock_depth = 0
+        self.disk_version = None
+        self.columnar = columnar
+        self.use_snapshot = snapshot
+        self.simulate_latency = simulate_latency
+        self.shards = None
+        if sharded:
+            shard_dir = os.path.join(os.path.dirname(self.data_file), "orders")
+            self.shards = OrderShards(shard_dir, hot_days=hot_days)
+        self.table = None
+        # Change tracking for delta sync: every add/update bumps the version
+        self.version = 0
+        self.deleted_orders = {}  # order id -> version at which it was deleted
+        self.status_counts = {}  # date -> status -> number of orders
+        with self.transaction(refresh=False):
+            self.load_data()
+
+    @contextmanager
+    def transaction(self, write=True, refresh=True):
+        """Hold the in-process and cross-process locks around an operation.
+
+        The file lock is shared for reads and exclusive for writes, and is
+        only taken by the outermost transaction of a thread. With
+        ``refresh`` the data is reloaded if another process changed it.
+        """
+        with self.lock:
+            outermost = self.lock_depth == 0
+            self.lock_depth += 1
+            lock_handle = None
+            try:
+                if outermost and fcntl is not None:
+                    lock_handle = open(self.lock_file, "a")
+                    fcntl.flock(lock_handle, fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+                if outermost and refresh and self.read_meta().get("version") != self.disk_version:
+                    # Reloading can write (snapshot, archival), so hold the lock exclusively
+                    if lock_handle is not None and not write:
+                        fcntl.flock(lock_handle, fcntl.LOCK_EX)
+                    self.load_data()
+                yield
+            finally:
+                self.lock_depth -= 1
+                if lock_handle is not None:
+                    fcntl.flock(lock_handle, fcntl.LOCK_UN)
+                    lock_handle.close()
+
+    def read_meta(self):
+        """Read the shared version counter and deletion tombstones."""
+        try:
+            with open(self.meta_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_meta(self):
+        meta = {
+            "version": self.version,
+            "min_version": self.min_delta_version,
+            "deleted": {str(order_id): version for order_id, version in self.deleted_orders.items()},
+        }
+        if self.status_counts is not None:
+            meta["counts"] = self.status_counts
+        tmp_path = self.meta_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_file)
+        self.disk_version = self.version
     
     def load_data(self):
         """Load data from file or create sample data if file doesn't exist."""
-        if os.path.exists(self.data_file):
+        self.table = None
+        self.deleted_orders = {}
+        self.min_delta_version = 0
+        self.status_counts = None
+        if self.shards is not None and self.shards.exists():
+            self.shards.load()
+            self.orders = None
+        elif self.use_snapshot and self.load_snapshot():
+            pass
+        elif os.path.exists(self.data_file):
             try:
                 with open(self.data_file, 'r') as f:
-                    self.orders = json.load(f)
+                    self.orders = [Order.from_dict(order) for order in json.load(f)]
             except:
                 self.orders = self.create_sample_data()
                 self.save_data()
         else:
             self.orders = self.create_sample_data()
             self.save_data()
+
+        if self.orders is None:
+            # Shards are written from versioned records
+            self.version = self.shards.max_version()
+        elif isinstance(self.orders, LazyOrderList):
+            # Snapshots are written from versioned records
+            self.version = self.orders.max_version()
+        else:
+            # Give every record a change version (older files don't have one)
+            self.version = max([order.version for order in self.orders], default=0)
+            for order in self.orders:
+                if not order.version:
+                    order.version = self.next_version()
+            if self.shards is not None:
+                self.shards.import_orders(self.orders)
+                self.orders = None
+            elif self.use_snapshot:
+                self.save_snapshot()
+
+        meta = self.read_meta()
+        if meta:
+            # Version counter and tombstones are shared by every process
+            self.version = max(self.version, meta["version"])
+            self.deleted_orders = {int(order_id): version for order_id, version in meta["deleted"].items()}
+            self.min_delta_version = meta["min_version"]
+        else:
+            # Deletions from before this load are unknown, so older clients must resync
+            self.deleted_orders = {}
+            self.min_delta_version = self.version
+        self.disk_version = meta.get("version")
+
+        if meta.get("counts") is not None:
+            self.status_counts = meta["counts"]
+        else:
+            # One scan when the sidecar predates the counters; kept up to date after that
+            self.status_counts = {}
+            for order in self.iter_all_orders():
+                self.count_status(order.date, order.status, 1)
+
+        if self.columnar and self.shards is None:
+            try:
+                from order_table import OrderTable
+            except ImportError as e:
+                print(f"Columnar storage unavailable ({e}), using list storage")
+                self.columnar = False
+            else:
+                self.table = OrderTable.from_records(self.orders)
+                self.orders = None
+
+    def delay(self, seconds):
+        """Sleep to simulate network latency, unless disabled."""
+        if self.simulate_latency:
+            time.sleep(seconds)
+
+    def count_status(self, date, status, delta):
+        """Adjust the per-date status counter."""
+        counts = self.status_counts.setdefault(date, {})
+        counts[status] = counts.get(status, 0) + delta
+        if counts[status] <= 0:
+            del counts[status]
+            if not counts:
+                del self.status_counts[date]
+
+    def next_version(self):
+        """Return the next change version."""
+        self.version += 1
+        return self.version
     
+    def iter_all_orders(self):
+        """Yield every order without decoding or copying more than needed."""
+        if self.shards is not None:
+            return self.shards.iter_orders()
+        if self.table is not None:
+            return self.table.iter_records()
+        if isinstance(self.orders, LazyOrderList):
+            return self.orders.iter_orders()
+        return iter(self.orders)
+
     def save_data(self):
         """Save data to file to simulate persistence."""
-        with open(self.data_file, 'w') as f:
-            json.dump(self.orders, f, indent=2)
+        if self.shards is not None:
+            # Only the days that changed are rewritten
+            self.shards.flush()
+        else:
+            with open(self.data_file, 'w') as f:
+                write_json_records(f, (order.to_dict() for order in self.iter_all_orders()))
+
+            # Written after the JSON so it counts as up to date on the next start
+            if self.use_snapshot:
+                self.save_snapshot()
+
+        self.save_meta()
+
+    def load_snapshot(self):
+        """Open the binary snapshot if it is at least as new as the JSON file."""
+        if not os.path.exists(self.snapshot_file):
+            return False
+        try:
+            if os.path.getmtime(self.snapshot_file) < os.path.getmtime(self.data_file):
+                return False
+            self.orders = LazyOrderList(OrderSnapshot(self.snapshot_file))
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Snapshot unavailable ({e}), loading JSON")
+            return False
+
+    def save_snapshot(self):
+        """Rewrite the binary snapshot from the current orders."""
+        try:
+            if isinstance(self.orders, LazyOrderList):
+                self.orders.save(self.snapshot_file)
+            else:
+                write_snapshot(self.snapshot_file, self.iter_all_orders())
+        except OSError as e:
+            print(f"Error saving snapshot: {e}")
+
+    def find_order_index(self, order_id):
+        """Return the list position of an order, or None."""
+        if isinstance(self.orders, LazyOrderList):
+            return self.orders.index_of_id(order_id)
+        for index, order in enumerate(self.orders):
+            if order.id == order_id:
+                return index
+        return None
     
     def create_sample_data(self):
         """Create sample order data."""
         today = datetime.now().strftime("%Y-%m-%d")
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        return [
+        return [Order.from_dict(order) for order in [
             {
                 "id": 1,
                 "order_number": "ORD-001",
@@ -83,75 +380,283 @@ class APIService:
                 "created_at": timestamp,
                 "updated_at": timestamp
             }
-        ]
+        ]]
     
     def get_orders(self, date=None, status=None, search_term=None):
         """Simulate API call to get orders with filtering."""
         # Simulate network delay
-        time.sleep(0.2)
-        
-        # Apply filters
-        filtered_orders = self.orders.copy()
-        
-        if date:
-            filtered_orders = [order for order in filtered_orders if order["date"] == date]
-        
-        if status:
-            filtered_orders = [order for order in filtered_orders if order["status"] == status]
-        
-        if search_term:
-            search_term = search_term.lower()
-            filtered_orders = [
-                order for order in filtered_orders 
-                if (search_term in order["order_number"].lower() or
-                    search_term in order["customer_name"].lower() or
-                    search_term in order["title"].lower())
-            ]
-        
-        # Sort by date and ID
-        filtered_orders.sort(key=lambda x: (x["date"], x["id"]), reverse=True)
-        
-        return filtered_orders
+        self.delay(LATENCY["get_orders"])
+
+        with self.transaction(write=False):
+            if self.table is not None:
+                return self.table.query(date=date, status=status, search_term=search_term)
+
+            orders = self.orders
+            if self.shards is not None:
+                orders = self.shards.orders_for(date)
+            elif isinstance(orders, LazyOrderList):
+                # Only decode the records for the requested date
+                orders = orders.select(date=date)
+
+            return filter_orders(orders, date=date, status=status, search_term=search_term)
     
-    def update_order_status(self, order_id, status):
-        """Simulate API call to update order status."""
+    def iter_orders(self, date=None, status=None, page_size=ITER_PAGE_SIZE):
+        """Yield copies of matching orders one at a time, in storage order.
+
+        Orders are copied ``page_size`` at a time, each page in its own
+        short read transaction, and yielded with the lock released, so a
+        slow consumer (an export writing a large file) neither holds up
+        other threads and processes nor holds every order in memory. Unlike
+        ``get_orders`` there is no simulated latency and no search.
+        """
+        cursor = None
+        while True:
+            with self.transaction(write=False):
+                page, cursor = self.order_page(cursor, date, status, page_size)
+            yield from page
+            if cursor is None:
+                return
+
+    def order_page(self, cursor, date, status, limit):
+        """Copies of up to ``limit`` matching orders after ``cursor``, and the next cursor.
+
+        The cursor is None at the start and when nothing is left. Table
+        rows never move, so there it is a row number; for lists it is the
+        list (a shard's date), a position and the id of the order before
+        that position, which finds the place again if orders were added or
+        deleted in between.
+        """
+        if self.table is not None:
+            rows = self.table.rows(date, status, cursor or 0)
+            page = [self.table.record(row) for row in rows[:limit]]
+            return page, (int(rows[limit - 1]) + 1 if len(rows) > limit else None)
+
+        if self.shards is not None:
+            days = [date] if date else sorted(self.shards.manifest)
+        else:
+            days = [None]
+        day, position, last_id = cursor or (days[0] if days else None, 0, None)
+        page = []
+        for day in days[days.index(day) if day in days else len(days):]:
+            orders = self.shards.day(day) if day is not None else self.orders
+            if last_id is not None:
+                position = resume_position(orders, position, last_id)
+            for order in iter_from(orders, position):
+                position += 1
+                last_id = order.id
+                if (not date or order.date == date) and (not status or order.status == status):
+                    page.append(order.copy())
+                    if len(page) == limit:
+                        return page, (day, position, last_id)
+            position, last_id = 0, None
+        return page, None
+
+    def update_order_status(self, order_id, status, expected_version=None):
+        """Simulate API call to update order status.
+
+        Returns the order's new version, or False if it wasn't updated.
+        With ``expected_version`` this is a compare-and-set: nothing is
+        changed and False is returned if the order's version differs,
+        i.e. someone else updated it first.
+        """
         # Simulate network delay
-        time.sleep(0.3)
-        
-        for order in self.orders:
-            if order["id"] == order_id:
-                order["status"] = status
-                order["updated_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.delay(LATENCY["update_order_status"])
+
+        with self.transaction():
+            updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+            if self.table is not None:
+                row = self.table.find_row(order_id)
+                if row is None:
+                    return False
+                if expected_version is not None and int(self.table.versions[row]) != expected_version:
+                    return False
+                date = self.table.columns["date"].get(row)
+                self.count_status(date, self.table.columns["status"].get(row), -1)
+                self.count_status(date, status, 1)
+                version = self.next_version()
+                self.table.set_fields(
+                    row,
+                    status=status,
+                    updated_at=updated_at,
+                    version=version,
+                )
                 self.save_data()
-                return True
-        
-        return False
+                return version
+
+            if self.shards is not None:
+                order = self.shards.find(order_id)
+            else:
+                index = self.find_order_index(order_id)
+                order = self.orders[index] if index is not None else None
+            if order is None:
+                return False
+            if expected_version is not None and order.version != expected_version:
+                return False
+
+            self.count_status(order.date, order.status, -1)
+            self.count_status(order.date, status, 1)
+            order.status = status
+            order.updated_at = updated_at
+            order.version = self.next_version()
+            if self.shards is not None:
+                self.shards.touch(order)
+            self.save_data()
+            return order.version
     
     def add_order(self, order_number, customer_name, product_name, url, tag_color="#FF5733", status="Pending"):
         """Simulate API call to add a new order."""
         # Simulate network delay
-        time.sleep(0.5)
-        
-        today = datetime.now().strftime("%Y-%m-%d")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Generate new ID
-        new_id = max([order["id"] for order in self.orders]) + 1 if self.orders else 1
-        
-        new_order = {
-            "id": new_id,
+        self.delay(LATENCY["add_order"])
+
+        return self.insert_orders([{
             "order_number": order_number,
             "customer_name": customer_name,
-            "title": product_name,
+            "product_name": product_name,
             "url": url,
             "tag_color": tag_color,
             "status": status,
-            "date": today,
-            "created_at": timestamp,
-            "updated_at": timestamp
-        }
-        
-        self.orders.append(new_order)
-        self.save_data()
-        
-        return new_id
+        }])[0]
+
+    def add_orders(self, orders):
+        """Simulate API call adding several orders in one request.
+
+        ``orders`` is a list of dicts with the ``add_order`` arguments. The
+        ids are assigned as one block and the data is saved once. Returns
+        the new ids.
+        """
+        # Simulate network delay (one request for the whole batch)
+        self.delay(LATENCY["add_orders"])
+
+        return self.insert_orders(orders)
+
+    def insert_orders(self, orders):
+        """Add orders with consecutive ids and save once."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        with self.transaction():
+            # Generate new IDs
+            if self.shards is not None:
+                first_id = self.shards.max_id() + 1
+            elif self.table is not None:
+                first_id = self.table.max_id() + 1
+            elif isinstance(self.orders, LazyOrderList):
+                first_id = self.orders.max_id() + 1
+            else:
+                first_id = max([order.id for order in self.orders]) + 1 if self.orders else 1
+
+            new_ids = []
+            for new_id, fields in enumerate(orders, first_id):
+                new_order = Order(
+                    id=new_id,
+                    order_number=fields["order_number"],
+                    customer_name=fields["customer_name"],
+                    title=fields["product_name"],
+                    url=fields["url"],
+                    tag_color=fields.get("tag_color", "#FF5733"),
+                    status=fields.get("status", "Pending"),
+                    date=today,
+                    created_at=timestamp,
+                    updated_at=timestamp,
+                    version=self.next_version(),
+                )
+
+                if self.shards is not None:
+                    self.shards.add(new_order)
+                elif self.table is not None:
+                    self.table.append(new_order)
+                else:
+                    self.orders.append(new_order)
+                self.count_status(new_order.date, new_order.status, 1)
+                new_ids.append(new_id)
+
+            if new_ids:
+                self.save_data()
+
+        return new_ids
+
+    def delete_order(self, order_id):
+        """Simulate API call to delete an order."""
+        # Simulate network delay
+        self.delay(LATENCY["delete_order"])
+
+        with self.transaction():
+            if self.table is not None:
+                row = self.table.find_row(order_id)
+                if row is None:
+                    return False
+                order = self.table.record(row)
+                self.table.delete(row)
+            elif self.shards is not None:
+                order = self.shards.remove(order_id)
+                if order is None:
+                    return False
+            else:
+                index = self.find_order_index(order_id)
+                if index is None:
+                    return False
+                order = self.orders[index]
+                del self.orders[index]
+
+            self.count_status(order.date, order.status, -1)
+            self.deleted_orders[order_id] = self.next_version()
+            self.save_data()
+            return True
+
+    def get_orders_changed_since(self, version=0, date=None):
+        """Simulate API call returning the orders changed after a version.
+
+        Returns a dict with the current ``version``, the ``upserts`` (added or
+        updated orders) and the ids of ``deleted`` orders. When ``full`` is
+        True the client's version is too old to be patched and it has to
+        replace its snapshot with ``upserts``. With a ``date`` only that
+        day's orders are returned, so a client can start with the day it
+        shows rather than the whole history.
+        """
+        # Simulate network delay (the payload only holds the changes)
+        self.delay(LATENCY["get_orders_changed_since"])
+
+        with self.transaction(write=False):
+            full = version < self.min_delta_version
+            if full:
+                version = 0
+
+            if self.shards is not None:
+                upserts = [order.copy() for order in self.shards.changed_since(version, date)]
+            elif self.table is not None:
+                upserts = self.table.changed_since(version, date)
+            elif isinstance(self.orders, LazyOrderList):
+                upserts = [order.copy() for order in self.orders.select(date=date, min_version=version)]
+            else:
+                upserts = [
+                    order.copy() for order in self.orders
+                    if order.version > version and (not date or order.date == date)
+                ]
+
+            return {
+                "version": self.version,
+                "full": full,
+                "upserts": upserts,
+                "deleted": [
+                    order_id for order_id, deleted_version in self.deleted_orders.items()
+                    if deleted_version > version
+                ],
+            }
+
+    def get_summary(self, date=None):
+        """Simulate API call returning order counts by status.
+
+        Answered from counters kept up to date on every change, so no orders
+        are read. Covers one date, or every date when none is given.
+        """
+        # Simulate network delay
+        self.delay(LATENCY["get_summary"])
+
+        with self.transaction(write=False):
+            dates = [date] if date else list(self.status_counts)
+            by_status = {}
+            for day in dates:
+                for status, count in self.status_counts.get(day, {}).items():
+                    by_status[status] = by_status.get(status, 0) + count
+            return {"date": date, "total": sum(by_status.values()), "by_status": by_status}
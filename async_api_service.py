@@ -0,0 +1,133 @@
+import asyncio
+import threading
+
+import api_service
+
+
+class AsyncAPIService:
+    """APIService with its operations as coroutines.
+
+    The simulated latency is awaited instead of slept, so independent calls
+    overlap: fetching orders and a delta together costs the slower of the
+    two rather than their sum. At most ``max_concurrency`` calls are in
+    flight at once. The storage work itself runs in a worker thread through
+    the wrapped ``APIService``, whose transactions keep it consistent.
+
+    Other keyword arguments (``columnar``, ``snapshot``, ``sharded``, ...)
+    are passed to ``APIService``.
+    """
+
+    def __init__(self, max_concurrency=4, simulate_latency=True, **options):
+        self.api = api_service.APIService(simulate_latency=False, **options)
+        self.max_concurrency = max_concurrency
+        self.simulate_latency = simulate_latency
+        self.semaphore = None
+        self.semaphore_loop = None
+
+    def get_semaphore(self):
+        # A semaphore belongs to one event loop; make a new one per loop
+        loop = asyncio.get_running_loop()
+        if self.semaphore_loop is not loop:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+            self.semaphore_loop = loop
+        return self.semaphore
+
+    async def call(self, method, **params):
+        async with self.get_semaphore():
+            if self.simulate_latency:
+                await asyncio.sleep(api_service.LATENCY.get(method, 0))
+            return await asyncio.to_thread(getattr(self.api, method), **params)
+
+    async def batch(self, calls):
+        """Run ``(method, params)`` calls concurrently.
+
+        Returns one result per call, in order; a call that raised gives its
+        exception in its place.
+        """
+        return await asyncio.gather(
+            *(self.call(method, **params) for method, params in calls),
+            return_exceptions=True,
+        )
+
+    async def get_orders(self, date=None, status=None, search_term=None):
+        return await self.call("get_orders", date=date, status=status, search_term=search_term)
+
+    async def get_orders_changed_since(self, version=0, date=None):
+        return await self.call("get_orders_changed_since", version=version, date=date)
+
+    async def update_order_status(self, order_id, status, expected_version=None):
+        return await self.call(
+            "update_order_status",
+            order_id=order_id,
+            status=status,
+            expected_version=expected_version,
+        )
+
+    async def add_order(self, order_number, customer_name, product_name, url, tag_color="#FF5733", status="Pending"):
+        return await self.call(
+            "add_order",
+            order_number=order_number,
+            customer_name=customer_name,
+            product_name=product_name,
+            url=url,
+            tag_color=tag_color,
+            status=status,
+        )
+
+    async def add_orders(self, orders):
+        return await self.call("add_orders", orders=orders)
+
+    async def delete_order(self, order_id):
+        return await self.call("delete_order", order_id=order_id)
+
+    async def get_summary(self, date=None):
+        return await self.call("get_summary", date=date)
+
+
+class SyncAPIService:
+    """Blocking facade over ``AsyncAPIService`` for threaded callers.
+
+    Runs an event loop in a background thread. Single calls block like
+    ``APIService`` does; ``batch`` sends several calls at once and waits
+    for all of them, so a refresh pays for one round of latency.
+    """
+
+    def __init__(self, max_concurrency=4, simulate_latency=True, **options):
+        self.service = AsyncAPIService(max_concurrency, simulate_latency, **options)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def batch(self, calls):
+        return self.run(self.service.batch(calls))
+
+    def get_orders(self, date=None, status=None, search_term=None):
+        return self.run(self.service.get_orders(date, status, search_term))
+
+    def get_orders_changed_since(self, version=0, date=None):
+        return self.run(self.service.get_orders_changed_since(version, date))
+
+    def update_order_status(self, order_id, status, expected_version=None):
+        return self.run(self.service.update_order_status(order_id, status, expected_version))
+
+    def add_order(self, order_number, customer_name, product_name, url, tag_color="#FF5733", status="Pending"):
+        return self.run(
+            self.service.add_order(order_number, customer_name, product_name, url, tag_color, status)
+        )
+
+    def add_orders(self, orders):
+        return self.run(self.service.add_orders(orders))
+
+    def delete_order(self, order_id):
+        return self.run(self.service.delete_order(order_id))
+
+    def get_summary(self, date=None):
+        return self.run(self.service.get_summary(date))
@@ -0,0 +1,209 @@
+import threading
+import time
+from collections import deque
+
+import ndef
+from nfc_service import ALREADY_WRITTEN, APDUTimeoutError
+
+
+class BatchWriter:
+    """Writes a queue of orders to tags as they are presented.
+
+    ``readers`` is one reader or a list of them (see ``ReaderManager``);
+    each gets its own worker thread, and all of them take orders from the
+    same queue. A worker polls its reader, and each time a new UID shows up
+    the next order's URL is written to it. Success moves the queue on; a
+    failed order goes back to the front of the queue for the next tag on
+    any reader. A tag already written in this batch is skipped when it is
+    presented again, so putting the same tag back down never overwrites it
+    with the next order.
+
+    Each order's NDEF image is staged before its tag arrives: the next
+    order is encoded right after a write, while the worker waits for the
+    tag to be swapped, so only the APDUs are left on the critical path.
+    Orders whose URL can't be encoded are reported and passed over, and a
+    tag that already holds the order's URL counts as written without being
+    rewritten. Written tags are bound to their order in ``bindings`` (a
+    ``TagBindings``) when one is given. A tag holding the URL but bound to
+    a different order is credited to that order instead, as ``"already"``
+    with the bound order (None if it isn't in this batch), and the claimed
+    order goes back to the front of the queue. With a ``write_log``, every
+    attempt is logged and a tag issued before this batch is reported as
+    ``"reissued"`` before it is overwritten.
+
+    ``on_event(event, order, uid, reader)`` is called from the worker
+    threads with ``"written"``, ``"failed"``, ``"already"``, ``"skipped"``,
+    ``"reissued"``, ``"invalid"`` or ``"done"``; ``reader`` is the reader's
+    name.
+    """
+
+    def __init__(self, readers, orders, on_event, write_log=None, bindings=None, poll_interval=0.1, rate_window=20):
+        self.readers = readers if isinstance(readers, (list, tuple)) else [readers]
+        self.orders = list(orders)
+        self.by_id = {order.id: order for order in self.orders}
+        self.pending = deque(self.orders)
+        self.on_event = on_event
+        self.write_log = write_log
+        self.bindings = bindings
+        self.poll_interval = poll_interval
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.written = 0
+        self.failed = 0
+        self.written_uids = set()
+        self.write_times = deque(maxlen=rate_window)
+        self.running = False
+        self.threads = []
+        self.active_workers = 0
+
+    def current(self):
+        """The order the next tag will get, or None when the queue is done."""
+        with self.lock:
+            return self.pending[0] if self.pending else None
+
+    def stage(self, order, tag_type="NTAG213"):
+        """Encode an order's NDEF image ahead of its write (cached by URL)."""
+        try:
+            return ndef.url_image(order.url, tag_type)
+        except ValueError:
+            return None
+
+    def tags_per_minute(self):
+        """Write rate over the last ``rate_window`` tags, across all readers."""
+        with self.lock:
+            count = len(self.write_times)
+            if count < 2:
+                return None
+            span = self.write_times[-1] - self.write_times[0]
+        return (count - 1) * 60 / span if span else None
+
+    def start(self):
+        self.running = True
+        self.active_workers = len(self.readers)
+        self.threads = [
+            threading.Thread(target=self.run, args=(reader,), daemon=True) for reader in self.readers
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        self.running = False
+
+    def claim(self, tag_type):
+        """Take the next order with a writable image off the queue."""
+        while True:
+            with self.lock:
+                if not self.pending:
+                    return None, None
+                order = self.pending.popleft()
+                self.in_flight += 1
+            image = self.stage(order, tag_type)
+            if image is not None:
+                return order, image
+            with self.lock:
+                self.in_flight -= 1
+            self.on_event("invalid", order, None, None)
+
+    def credit_bound_order(self, order, uid, name, started):
+        """Credit a tag that already held the URL to the order it is bound to.
+
+        Returns False when the tag is unbound or bound to ``order`` itself,
+        so the caller credits ``order`` as usual.
+        """
+        binding = self.bindings.lookup(uid) if self.bindings is not None else None
+        if binding is None or binding["order_id"] == order.id:
+            return False
+
+        bound = self.by_id.get(binding["order_id"])
+        if self.write_log is not None:
+            self.write_log.record(
+                binding["order_id"], uid, binding["url"], True, time.monotonic() - started, ALREADY_WRITTEN
+            )
+        with self.lock:
+            self.in_flight -= 1
+            self.written_uids.add(uid)
+            # The claimed order still needs a tag of its own
+            self.pending.appendleft(order)
+            if bound is not None and bound in self.pending:
+                self.pending.remove(bound)
+                self.written += 1
+        self.on_event("already", bound, uid, name)
+        return True
+
+    def finished(self):
+        with self.lock:
+            return not self.pending and not self.in_flight
+
+    def run(self, reader):
+        name = str(getattr(reader, "reader", None) or "reader")
+        tag_type = getattr(reader, "tag_type", "NTAG213")
+        last_uid = None
+        while self.running and not self.finished():
+            try:
+                uid = reader.read_uid()
+            except Exception:
+                uid = None
+
+            if not uid or uid == last_uid:
+                # Nothing new on the reader; wait for the next tag
+                last_uid = uid
+                time.sleep(self.poll_interval)
+                continue
+            last_uid = uid
+
+            with self.lock:
+                already_written = uid in self.written_uids
+            if already_written:
+                self.on_event("skipped", self.current(), uid, name)
+                continue
+
+            order, image = self.claim(tag_type)
+            if order is None:
+                # Another reader took the last order
+                continue
+
+            if self.write_log is not None and self.write_log.issued(uid):
+                self.on_event("reissued", order, uid, name)
+
+            started = time.monotonic()
+            result = None
+            try:
+                success = reader.write_ndef_image(image)
+            except APDUTimeoutError:
+                success, result = False, "timeout"
+            except Exception:
+                success = False
+            if success == ALREADY_WRITTEN and self.credit_bound_order(order, uid, name, started):
+                continue
+            if self.write_log is not None:
+                if success == ALREADY_WRITTEN:
+                    result = ALREADY_WRITTEN
+                self.write_log.record(order.id, uid, order.url, success, time.monotonic() - started, result)
+            if success and self.bindings is not None:
+                # A tag that already held the URL keeps any binding it has
+                if success != ALREADY_WRITTEN or self.bindings.lookup(uid) is None:
+                    self.bindings.bind(uid, order.id, order.url)
+
+            with self.lock:
+                self.in_flight -= 1
+                if success:
+                    self.written += 1
+                    self.written_uids.add(uid)
+                    self.write_times.append(time.monotonic())
+                else:
+                    # Keep the order first in line; it goes to the next tag presented
+                    self.failed += 1
+                    self.pending.appendleft(order)
+                upcoming = self.pending[0] if self.pending else None
+
+            if success and upcoming is not None:
+                # Look ahead while the tag is being swapped
+                self.stage(upcoming, tag_type)
+            self.on_event("written" if success else "failed", order, uid, name)
+
+        with self.lock:
+            self.active_workers -= 1
+            last_worker = self.active_workers == 0
+        if last_worker:
+            self.running = False
+            self.on_event("done", None, None, None)
@@ -0,0 +1,196 @@
+import hashlib
+from functools import lru_cache
+from urllib.parse import urlsplit
+
+# NTAG user memory starts at page 4
+FIRST_PAGE = 4
+PAGE_SIZE = 4
+# User memory per tag type, in bytes
+TAG_CAPACITIES = {
+    "NTAG213": 144,  # pages 4-39
+    "NTAG215": 504,  # pages 4-129
+    "NTAG216": 888,  # pages 4-225
+}
+TAG_CAPACITY = TAG_CAPACITIES["NTAG213"]
+# The capability container page; its byte 2 is the data area size / 8
+CC_PAGE = 3
+CC_MAGIC = 0xE1
+CC_SIZES = {0x12: "NTAG213", 0x3E: "NTAG215", 0x6D: "NTAG216"}
+IMAGE_CACHE_SIZE = 1024
+# NDEF message TLV holding one empty record, then the terminator TLV
+EMPTY_MESSAGE = bytes([0x03, 0x03, 0xD0, 0x00, 0x00, 0xFE])
+
+# URI identifier codes for the prefixes we abbreviate
+URI_PREFIXES = (
+    ("https://", 0x02),
+    ("http://", 0x01),
+)
+
+
+def normalize_url(url):
+    """Return the URL as it will be written to a tag.
+
+    Adds ``http://`` when there is no scheme and drops non-ASCII
+    characters, the same way ``write_ntag_url`` always has. Raises
+    ``ValueError`` when there is no host.
+    """
+    url = url.strip()
+    if not url.startswith(("http://", "https://")):
+        url = "http://" + url
+    url = "".join(c for c in url if ord(c) < 128)
+    if not urlsplit(url).netloc:
+        raise ValueError(f"URL has no host: {url!r}")
+    return url
+
+
+def encode_url(url, capacity=TAG_CAPACITY):
+    """Build the NDEF message bytes for a URI record.
+
+    For URLs up to 250 bytes the layout is
+    ``[0x03, length, 0xD1, 0x01, payload_length, 0x55, prefix, ...URL..., 0xFE]``:
+    an NDEF message TLV holding one short URI record, then the terminator
+    TLV. Longer URLs (NTAG215/216 only) use the long record and the 3-byte
+    TLV length. Raises ``ValueError`` when the message doesn't fit on the tag.
+    """
+    prefix_type = 0x00
+    for prefix, code in URI_PREFIXES:
+        if url.startswith(prefix):
+            url = url[len(prefix):]
+            prefix_type = code
+            break
+
+    url_bytes = url.encode("ascii", "ignore")
+    payload = bytes([prefix_type]) + url_bytes  # URI identifier code + URL
+    if len(payload) < 0x100:
+        # Short record: MB, ME, SR, TNF=well-known; one-byte payload length
+        record = bytes([0xD1, 0x01, len(payload)])
+    else:
+        record = bytes([0xC1, 0x01]) + len(payload).to_bytes(4, "big")
+    record += b"\x55" + payload  # 'U' - URI record type
+
+    if len(record) < 0xFF:
+        tlv = bytes([0x03, len(record)])
+    else:
+        tlv = bytes([0x03, 0xFF]) + len(record).to_bytes(2, "big")
+    data = tlv + record + b"\xFE"
+    if len(data) > capacity:
+        raise ValueError(f"URL too long for the tag ({len(data)} > {capacity} bytes)")
+    return data
+
+
+def to_pages(data):
+    """Split NDEF bytes into zero-padded 4-byte pages."""
+    if len(data) % PAGE_SIZE:
+        data = data + bytes(PAGE_SIZE - len(data) % PAGE_SIZE)
+    return [list(data[i : i + PAGE_SIZE]) for i in range(0, len(data), PAGE_SIZE)]
+
+
+def tlv_extent(data):
+    """Bytes of user memory in use, through the terminator after the NDEF message.
+
+    ``data`` is read from the start of user memory; the first 16 bytes are
+    enough for any layout we write. NULL, lock control and memory control
+    TLVs before the message are skipped. Returns None when the bytes don't
+    look like an NDEF TLV layout (blank or foreign data).
+    """
+    pos = 0
+    while pos < len(data):
+        tlv_type = data[pos]
+        if tlv_type == 0x00:  # NULL TLV, padding
+            pos += 1
+            continue
+        if tlv_type == 0xFE:  # Terminator with no message before it
+            return pos + 1
+        if tlv_type not in (0x01, 0x02, 0x03, 0xFD) or pos + 1 >= len(data):
+            return None
+
+        length, header = data[pos + 1], 2
+        if length == 0xFF:
+            if pos + 3 >= len(data):
+                return None
+            length, header = int.from_bytes(bytes(data[pos + 2 : pos + 4]), "big"), 4
+        end = pos + header + length
+        if tlv_type == 0x03:
+            return end + 1
+        pos = end
+    return None
+
+
+def decode_url(data):
+    """The URL in the first record of the NDEF message in ``data``, or None.
+
+    ``data`` is read from the start of user memory. Returns None when there
+    is no complete URI record there, including when ``data`` stops before
+    the end of the message.
+    """
+    pos = 0
+    while pos < len(data) and data[pos] == 0x00:
+        pos += 1
+    # Skip lock and memory control TLVs ahead of the message
+    while pos + 1 < len(data) and data[pos] in (0x01, 0x02, 0xFD):
+        pos += 2 + data[pos + 1]
+    if pos + 1 >= len(data) or data[pos] != 0x03:
+        return None
+
+    length, pos = data[pos + 1], pos + 2
+    if length == 0xFF:
+        length, pos = int.from_bytes(bytes(data[pos : pos + 2]), "big"), pos + 2
+    record = bytes(data[pos : pos + length])
+    if len(record) < length or len(record) < 3:
+        return None
+
+    flags, type_length = record[0], record[1]
+    if flags & 0x10:  # SR: one-byte payload length
+        payload_length, pos = record[2], 3
+    else:
+        payload_length, pos = int.from_bytes(record[2:6], "big"), 6
+    id_length = 0
+    if flags & 0x08:  # IL: ID length follows
+        id_length, pos = record[pos], pos + 1
+    record_type = record[pos : pos + type_length]
+    pos += type_length + id_length
+    payload = record[pos : pos + payload_length]
+    if flags & 0x07 != 0x01 or record_type != b"U" or not payload or len(payload) < payload_length:
+        return None
+
+    prefix = next((prefix for prefix, code in URI_PREFIXES if code == payload[0]), "")
+    return prefix + payload[1:].decode("ascii", "replace")
+
+
+def tag_type_from_cc(cc):
+    """The tag type a capability container declares, or None if unknown."""
+    if len(cc) < 3 or cc[0] != CC_MAGIC:
+        return None
+    return CC_SIZES.get(cc[2])
+
+
+def page_digest(data):
+    """Hash of a page range as read back from a tag, for write verification."""
+    return hashlib.sha256(bytes(data)).digest()
+
+
+class NdefImage:
+    """A URL encoded for one tag type, ready to write page by page."""
+
+    __slots__ = ("url", "tag_type", "data", "pages", "hex", "digest")
+
+    def __init__(self, url, tag_type, data):
+        self.url = url
+        self.tag_type = tag_type
+        self.data = data
+        self.pages = tuple(tuple(page) for page in to_pages(data))
+        self.hex = " ".join(f"{b:02X}" for b in data)
+        # Of the padded pages, which is what a read-back of them returns
+        self.digest = page_digest(b"".join(bytes(page) for page in self.pages))
+
+
+@lru_cache(maxsize=IMAGE_CACHE_SIZE)
+def url_image(url, tag_type="NTAG213"):
+    """Return the cached ``NdefImage`` for a URL and tag type.
+
+    Normalizing, encoding and paging happen once per URL, however many
+    tags it is written to. Raises ``ValueError`` for URLs that can't be
+    written (no host, or too long for the tag).
+    """
+    url = normalize_url(url)
+    return NdefImage(url, tag_type, encode_url(url, TAG_CAPACITIES[tag_type]))
@@ -1,10 +1,26 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext, simpledialog
+from tkinter import ttk, messagebox, scrolledtext, simpledialog, filedialog
 import nfc_service
+import os
+import queue
 import threading
 import time
 from datetime import datetime
 import api_service
+from batch_writer import BatchWriter
+from concurrent.futures import ThreadPoolExecutor
+import order_export
+import order_import
+from order_client import OrderClient
+from reader_manager import ReaderManager
+import reader_supervisor
+from tag_bindings import TagBindings
+from write_log import WriteLog
+
+# Set to e.g. http://127.0.0.1:8765 to share one order_server between stations
+ORDER_SERVICE_URL = os.environ.get("ORDER_SERVICE_URL")
+# Zeroing all of an NTAG216 takes a few hundred APDUs
+FULL_ERASE_TIMEOUT = 30.0
 
 class NFCApp:
     """Unified NFC application with read and write modes in a single window."""
@@ -15,13 +31,38 @@ class NFCApp:
         self.root.geometry("1000x700")
         self.root.configure(bg="#f0f2f5")
         self.nfc_reader = nfc_service.NFCReader(self.log)
+        # Reconnects the reader after unplugs and glitches
+        self.reader_supervisor = reader_supervisor.ReaderSupervisor(
+            self.nfc_reader, self.log, on_health=self.reader_health_changed
+        )
+        self.reader_health_var = tk.StringVar(value="Reader: connecting...")
         self.current_mode = None  # 'read' or 'write'
         self.tasks = []
+        # Local copy of all orders, kept current with delta syncs
+        self.order_snapshot = {}
+        self.snapshot_version = 0
+        # Dates loaded in full ("" for every date); others only hold orders changed since
+        self.synced_dates = set()
+        # Syncs run from the Tk thread, the read poller and the status executor
+        self.snapshot_lock = threading.RLock()
         self.read_mode_running = False
         self.last_uid = None
+        self.last_reader = None
+        self.write_log = WriteLog()
+        # Load the issued-UID filter now rather than on the first write
+        threading.Thread(target=self.write_log.uids.ensure_loaded, daemon=True).start()
+        # Tag UID -> the order it was written for, for instant lookups in read mode
+        self.tag_bindings = TagBindings()
+        # Every attached reader, polled in read mode and used as batch-write heads
+        self.reader_manager = ReaderManager(self.log, primary=self.nfc_reader, bindings=self.tag_bindings)
+        # Status updates from batch writes are sent to the API one at a time, off the Tk thread
+        self.status_executor = ThreadPoolExecutor(max_workers=1)
 
         # Initialize API service
-        self.api = api_service.APIService()
+        if ORDER_SERVICE_URL:
+            self.api = OrderClient(ORDER_SERVICE_URL)
+        else:
+            self.api = api_service.APIService(snapshot=True)
 
         # Create frames for different modes
         self.main_frame = ttk.Frame(self.root, padding="20")
@@ -35,6 +76,7 @@ class NFCApp:
 
         self.setup_ui()
         self.connect_reader()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_ui(self):
         # Configure styles
@@ -91,6 +133,11 @@ class NFCApp:
         )
         write_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
+        # Reader connection state
+        ttk.Label(
+            self.main_frame, textvariable=self.reader_health_var, font=("Arial", 10)
+        ).pack(pady=(20, 0))
+
     def setup_read_screen(self):
         """Set up the read mode screen."""
         # Back button at the top
@@ -138,6 +185,15 @@ class NFCApp:
         ttk.Label(
             url_frame, textvariable=self.url_var, font=("Arial", 30, "bold")
         ).pack(side=tk.LEFT)
+
+        # Order display (from the tag's binding, when it was written here)
+        order_frame = ttk.Frame(data_frame)
+        order_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Label(order_frame, text="Order:", width=10).pack(side=tk.LEFT)
+        self.order_var = tk.StringVar(value="None")
+        ttk.Label(
+            order_frame, textvariable=self.order_var, font=("Arial", 12, "bold")
+        ).pack(side=tk.LEFT)
         
         # Action buttons frame
         action_frame = ttk.Frame(data_frame)
@@ -152,6 +208,13 @@ class NFCApp:
         )
         format_button.pack(side=tk.LEFT, padx=5)
 
+        # Secure Erase button (zeroes all user memory, not just the old message)
+        ttk.Button(
+            action_frame,
+            text="Secure Erase",
+            command=lambda: self.format_card(full=True),
+        ).pack(side=tk.LEFT, padx=5)
+
         # Log display
         log_frame = ttk.LabelFrame(self.read_frame, text="Log")
         log_frame.pack(fill=tk.X, padx=20, pady=10)
@@ -241,6 +304,15 @@ class NFCApp:
         ttk.Button(button_frame, text="Add New Order", command=self.add_task).pack(
             side=tk.LEFT, padx=5
         )
+        ttk.Button(button_frame, text="Batch Write", command=self.batch_write).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Button(button_frame, text="Import Orders", command=self.import_orders).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Button(button_frame, text="Export & Report", command=self.export_orders).pack(
+            side=tk.LEFT, padx=5
+        )
         ttk.Button(
             button_frame, text="Disable Beep", command=self.nfc_reader.disable_beep
         ).pack(side=tk.LEFT, padx=5)
@@ -308,28 +380,26 @@ class NFCApp:
         self.status_text.pack(padx=5, pady=5, fill=tk.BOTH)
 
     def connect_reader(self):
-        """Connect to the NFC reader in a background thread."""
-
-        def connect_loop():
-            max_attempts = 5
-            for attempt in range(max_attempts):
-                if self.nfc_reader.connect():
-                    self.nfc_reader.disable_beep()
-                    self.log("NFC reader connected successfully.")
-                    return
-                self.log(
-                    f"Connection attempt {attempt + 1}/{max_attempts} failed. Retrying in 3 seconds..."
-                )
-                time.sleep(3)
-            self.log("Failed to connect to NFC reader.")
-            messagebox.showerror("Error", "Could not connect to NFC reader.")
-
-        threading.Thread(target=connect_loop, daemon=True).start()
+        """Connect to the NFC reader and keep it connected in the background."""
+        self.reader_supervisor.start()
+
+    def on_close(self):
+        """Release the extra batch-write readers and finish logging, then close the window."""
+        self.reader_manager.disconnect()
+        # The log writer is a daemon thread; don't lose the entries it still holds
+        self.write_log.flush()
+        self.root.destroy()
+
+    def reader_health_changed(self, health):
+        """Called by the supervisor when the reader connects or drops."""
+        if health == reader_supervisor.CONNECTED:
+            self.nfc_reader.disable_beep()
+        self.root.after(0, lambda: self.reader_health_var.set(f"Reader: {health}"))
 
     def show_main_screen(self):
         """Show the main selection screen."""
         # Stop any running read mode
-        self.read_mode_running = False
+        self.stop_read_mode()
 
         # Hide other frames
         self.read_frame.pack_forget()
@@ -349,9 +419,26 @@ class NFCApp:
         self.read_frame.pack(fill=tk.BOTH, expand=True)
         self.current_mode = "read"
 
-        # Start tag polling
+        # Poll every attached reader and show the tags they report
         self.read_mode_running = True
-        threading.Thread(target=self.poll_tag, daemon=True).start()
+        while not self.reader_manager.events.empty():
+            self.reader_manager.events.get_nowait()  # left over from the last session
+        threading.Thread(target=self.start_read_mode, daemon=True).start()
+        self.root.after(100, self.show_reader_events)
+
+    def stop_read_mode(self):
+        if self.read_mode_running:
+            self.read_mode_running = False
+            self.reader_manager.stop()
+
+    def describe_binding(self, binding):
+        """Order, customer and status line for a tag's binding."""
+        if not binding:
+            return "Not written at this station"
+        order = self.order_snapshot.get(binding["order_id"])
+        if order is None:
+            return f"Order #{binding['order_id']} (written {binding['time']})"
+        return f"{order.order_number} - {order.customer_name} - {order.status}"
 
     def show_write_mode(self):
         """Show the write mode screen."""
@@ -360,131 +447,51 @@ class NFCApp:
         self.read_frame.pack_forget()
 
         # Show write frame
+        self.stop_read_mode()
         self.write_frame.pack(fill=tk.BOTH, expand=True)
         self.current_mode = "write"
 
         # Fetch and display tasks
         self.fetch_tasks()
 
-    def poll_tag(self):
-        """Poll for NFC tag in real-time."""
-        card_removed_error_count = 0  # Counter for consecutive card removal errors
-        last_error_time = 0  # Time of last error message
-        connection_error_count = 0  # Counter for connection errors
-
-        while self.read_mode_running:
+    def start_read_mode(self):
+        """Bring the orders up to date, then start the reader workers."""
+        try:
+            self.sync_orders()
+        except Exception as e:
+            self.log(f"Could not refresh orders: {e}")
+        if self.read_mode_running:
+            self.reader_manager.start()
+
+    def show_reader_events(self):
+        """Show the tags the reader workers reported since the last check."""
+        if not self.read_mode_running:
+            return
+        while True:
             try:
-                # Check if we need to attempt reconnection
-                if connection_error_count > 5:
-                    try:
-                        self.log("Attempting to reconnect to reader...")
-                        if self.nfc_reader.connect():
-                            self.log("Successfully reconnected to reader")
-                            connection_error_count = 0
-                        else:
-                            self.log("Failed to reconnect to reader, will retry later")
-                            time.sleep(3)  # Wait before next attempt
-                            continue
-                    except Exception as reconnect_error:
-                        self.log(f"Error during reconnection: {reconnect_error}")
-                        time.sleep(3)  # Wait before next attempt
-                        continue
-
-                # Try to read the tag UID
-                uid = None
-                try:
-                    uid = self.nfc_reader.read_uid()
-                    # Reset connection error counter on successful operation
-                    connection_error_count = 0
-                except Exception as uid_error:
-                    error_str = str(uid_error)
-                    if "card not connected" in error_str.lower():
-                        connection_error_count += 1
-                        if connection_error_count % 5 == 1:  # Log only occasionally
-                            self.log(
-                                "Card reader connection issue, will attempt to recover"
-                            )
-                        time.sleep(1)
-                        continue
-                    else:
-                        # For other errors, just continue with uid=None
-                        pass
-
-                if uid:
-                    # Reset error counter when successful read
-                    card_removed_error_count = 0
-
-                    if uid != self.last_uid:
-                        # New tag detected
-                        self.last_uid = uid
-                        self.uid_var.set(uid)
-
-                        # Try to read URL safely
-                        url = None
-                        try:
-                            url = self.nfc_reader.read_ntag_url()
-                        except Exception as url_error:
-                            self.log(f"Error reading URL: {url_error}")
-
-                        self.url_var.set(url if url else "None")
-                        self.log(
-                            f"Tag detected - UID: {uid}, URL: {url if url else 'None'}"
-                        )
-                else:
-                    # No tag present, clear the display if there was a tag before
-                    if self.last_uid:
-                        self.last_uid = None
-                        self.uid_var.set("None")
-                        self.url_var.set("None")
-                        self.log("Tag removed")
-
-                # Successful operation, reset error counter
-                card_removed_error_count = 0
-                time.sleep(0.5)
-
-            except Exception as e:
-                # Check if the error is due to card removal or connection issues
-                error_str = str(e)
-                current_time = time.time()
-
-                if "card not connected" in error_str.lower():
-                    # Card reader connection error
-                    connection_error_count += 1
-                    if connection_error_count % 5 == 1:  # Log only occasionally
-                        self.log(
-                            "Card reader connection issue, will attempt to recover"
-                        )
-                    time.sleep(1)
-                elif (
-                    "0x80100069" in error_str
-                    or "card has been removed" in error_str.lower()
-                ):
-                    # Card removal error
-                    card_removed_error_count += 1
-
-                    # Only log the first error or if it's been a while since the last one
-                    if (
-                        card_removed_error_count == 1
-                        or (current_time - last_error_time) > 5
-                    ):
-                        if self.last_uid:
-                            self.last_uid = None
-                            self.uid_var.set("None")
-                            self.url_var.set("None")
-                            self.log("Tag removed")
-                        last_error_time = current_time
-
-                    # Adjust polling frequency based on consecutive errors
-                    if card_removed_error_count > 5:
-                        time.sleep(2)  # Longer delay after multiple errors
-                    else:
-                        time.sleep(0.5)
-                else:
-                    # Other error - always log these but not too frequently
-                    if (current_time - last_error_time) > 3:
-                        self.log(f"Error polling tag: {e}")
-                        last_error_time = current_time
-                    time.sleep(1)
+                name, uid, url = self.reader_manager.events.get_nowait()
+            except queue.Empty:
+                break
+            self.show_tag(name, uid, url)
+        self.root.after(100, self.show_reader_events)
+
+    def show_tag(self, reader, uid, url):
+        where = f" on {reader}" if len(self.reader_manager.heads) > 1 else ""
+        if uid:
+            self.last_uid = uid
+            self.last_reader = reader
+            self.uid_var.set(uid)
+            self.url_var.set(url if url else "None")
+            # A tag written here shows its order without reading its memory
+            self.order_var.set(self.describe_binding(self.tag_bindings.lookup(uid)))
+            self.log(f"Tag detected{where} - UID: {uid}, URL: {url if url else 'None'}")
+        elif self.last_uid and reader == self.last_reader:
+            # The tag on display was taken off its reader
+            self.last_uid = None
+            self.uid_var.set("None")
+            self.url_var.set("None")
+            self.order_var.set("None")
+            self.log(f"Tag removed{where}")
 
     def log(self, message):
         """Log a message to the appropriate text widget."""
@@ -522,13 +529,26 @@ class NFCApp:
         )
         date = self.date_filter_var.get()
 
-        # Fetch tasks from API
-        self.tasks = self.api.get_orders(
-            date=date, status=status, search_term=search_term
+        # Pull only the orders that changed since the last refresh
+        self.sync_orders(date)
+        with self.snapshot_lock:
+            orders = list(self.order_snapshot.values())
+        self.tasks = api_service.filter_orders(
+            orders,
+            date=date,
+            status=status,
+            search_term=search_term,
         )
 
-        # Update count label
-        self.task_count_var.set(f"Orders for Today: {len(self.tasks)}")
+        # The day's totals come from the API's counters, not a scan of the rows
+        summary = self.api.get_summary(date or None)
+        breakdown = ", ".join(
+            f"{name} {count}" for name, count in sorted(summary["by_status"].items())
+        )
+        header = f"Orders for Today: {summary['total']}" + (f" ({breakdown})" if breakdown else "")
+        if status or search_term:
+            header += f" - {len(self.tasks)} shown"
+        self.task_count_var.set(header)
 
         # Clear existing items
         for item in self.task_tree.get_children():
@@ -537,56 +557,91 @@ class NFCApp:
         # Add tasks to treeview
         for task in self.tasks:
             # Insert into treeview
-            self.task_tree.insert(
+            item = self.task_tree.insert(
                 "",
                 tk.END,
                 values=(
-                    task["id"],
-                    task["order_number"],
-                    task["customer_name"],
-                    task["title"],  # product_name stored as title
-                    task["url"],
-                    task["tag_color"],
-                    task.get("status", ""),
+                    task.id,
+                    task.order_number,
+                    task.customer_name,
+                    task.title,  # product_name stored as title
+                    task.url,
+                    task.tag_color,
+                    task.status,
                 ),
             )
 
             # Configure tag color
             self.task_tree.tag_configure(
-                f"color_{task['id']}", background=task["tag_color"]
+                f"color_{task.id}", background=task.tag_color
             )
 
             # Configure status-based styling
-            if task.get("status") in ["Success", "Completed"]:
+            if task.status in ["Success", "Completed"]:
                 self.task_tree.tag_configure(
-                    f"success_{task['id']}",
+                    f"success_{task.id}",
                     foreground="green",
                     font=("Arial", 9, "bold"),
                 )
                 self.task_tree.item(
-                    self.task_tree.get_children()[-1],
+                    item,
                     tags=(
-                        f"color_{task['id']}",
-                        f"success_{task['id']}",
+                        f"color_{task.id}",
+                        f"success_{task.id}",
                     ),
                 )
-            elif task.get("status") == "In Progress":
+            elif task.status == "In Progress":
                 self.task_tree.tag_configure(
-                    f"progress_{task['id']}",
+                    f"progress_{task.id}",
                     foreground="blue",
                     font=("Arial", 9, "bold"),
                 )
                 self.task_tree.item(
-                    self.task_tree.get_children()[-1],
+                    item,
                     tags=(
-                        f"color_{task['id']}",
-                        f"progress_{task['id']}",
+                        f"color_{task.id}",
+                        f"progress_{task.id}",
                     ),
                 )
             else:
-                self.task_tree.item(
-                    self.task_tree.get_children()[-1], tags=(f"color_{task['id']}",)
-                )
+                self.task_tree.item(item, tags=(f"color_{task.id}",))
+
+    def sync_orders(self, date=None):
+        """Apply the API's changes since the last sync to the local snapshot.
+
+        A ``date`` ("" for every date) not loaded yet is pulled in full
+        first; the first sync without one loads today. The whole history
+        is only fetched when every date is shown.
+
+        Called from several threads; syncs run one at a time so each applies
+        the changes since the version the previous one reached.
+        """
+        with self.snapshot_lock:
+            if date is None and not self.synced_dates:
+                date = datetime.now().strftime("%Y-%m-%d")
+            if date is not None and not {date, ""} & self.synced_dates:
+                day = self.api.get_orders_changed_since(0, date=date or None)
+                for order in day["upserts"]:
+                    self.order_snapshot[order.id] = order
+                self.synced_dates.add(date)
+                if not self.snapshot_version:
+                    # Nothing else loaded yet, so nothing else to catch up on
+                    self.snapshot_version = day["version"]
+                    return
+
+            changes = self.api.get_orders_changed_since(self.snapshot_version)
+
+            if changes["full"]:
+                self.order_snapshot = {}
+                self.synced_dates = {""}
+
+            for order in changes["upserts"]:
+                self.order_snapshot[order.id] = order
+
+            for order_id in changes["deleted"]:
+                self.order_snapshot.pop(order_id, None)
+
+            self.snapshot_version = changes["version"]
 
     def add_task(self):
         """Add a new order via modal."""
@@ -702,6 +757,68 @@ class NFCApp:
             side=tk.LEFT, padx=10
         )
 
+    def import_orders(self):
+        """Bulk import orders from a CSV or JSONL file in the background."""
+        path = filedialog.askopenfilename(
+            title="Import Orders",
+            filetypes=[("Order files", "*.csv *.jsonl"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+
+        def progress(result):
+            message = f"Import: {result.imported} added, {result.rejected} rejected"
+            self.root.after(0, lambda: self.log(message))
+
+        def run_import():
+            try:
+                result = order_import.import_orders(self.api, path, progress=progress)
+            except Exception as e:
+                self.root.after(0, lambda e=e: self.log(f"Import failed: {e}"))
+                return
+
+            def finish():
+                for line_number, reason in result.errors:
+                    self.log(f"Import: line {line_number} skipped ({reason})")
+                self.log(f"Import finished: {result.imported} orders added")
+                self.fetch_tasks()
+
+            self.root.after(0, finish)
+
+        self.log(f"Importing orders from {path}...")
+        threading.Thread(target=run_import, daemon=True).start()
+
+    def export_orders(self):
+        """Export the selected date's orders and log the end-of-day report."""
+        date = self.date_filter_var.get()
+        path = filedialog.asksaveasfilename(
+            title="Export Orders",
+            initialfile=f"orders-{date}.csv",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not path:
+            return
+
+        def run_export():
+            try:
+                count = order_export.export_orders(self.api, path, date=date)
+                lines = order_export.format_report(
+                    order_export.end_of_day_report(self.api, date, self.write_log)
+                )
+            except Exception as e:
+                self.root.after(0, lambda e=e: self.log(f"Export failed: {e}"))
+                return
+
+            def finish():
+                self.log(f"Exported {count} orders to {path}")
+                for line in lines:
+                    self.log(line)
+
+            self.root.after(0, finish)
+
+        threading.Thread(target=run_export, daemon=True).start()
+
     def write_task_url(self):
         """Write selected task's URL to NFC tag."""
         selected = self.task_tree.selection()
@@ -710,7 +827,7 @@ class NFCApp:
             return
 
         task_id = self.task_tree.item(selected[0])["values"][0]
-        task = next((t for t in self.tasks if t["id"] == task_id), None)
+        task = next((t for t in self.tasks if t.id == task_id), None)
         if not task:
             messagebox.showerror("Error", "Task not found!")
             return
@@ -736,11 +853,11 @@ class NFCApp:
             write_dialog, text="Write URL to NFC Tag", font=("Arial", 14, "bold")
         ).pack(pady=(15, 10))
 
-        ttk.Label(write_dialog, text=f"Task: {task['title']}", font=("Arial", 11)).pack(
+        ttk.Label(write_dialog, text=f"Task: {task.title}", font=("Arial", 11)).pack(
             pady=2
         )
 
-        ttk.Label(write_dialog, text=f"URL: {task['url']}", font=("Arial", 11)).pack(
+        ttk.Label(write_dialog, text=f"URL: {task.url}", font=("Arial", 11)).pack(
             pady=(2, 15)
         )
 
@@ -798,7 +915,7 @@ class NFCApp:
 
                     # Log the operation
                     self.log(
-                        f"Writing URL: {task['url']} to tag with UID: {current_uid}"
+                        f"Writing URL: {task.url} to tag with UID: {current_uid}"
                     )
 
                     # Start the write operation in a separate thread
@@ -817,14 +934,36 @@ class NFCApp:
             """Perform the actual write operation."""
             nonlocal polling_active
 
+            # Warn before a tag issued earlier (here or at another station) is overwritten
+            if self.write_log.issued(tag_uid):
+                self.log(f"Warning: tag {tag_uid} was issued before and may be overwritten")
+                self.root.after(
+                    0, lambda: status_var.set("Warning: this tag was issued before")
+                )
+
+            started = time.monotonic()
             try:
                 # Attempt to write the URL to the tag
-                if self.nfc_reader.write_ntag_url(task["url"]):
+                success = self.nfc_reader.write_ntag_url(task.url)
+                duration = time.monotonic() - started
+                if success == nfc_service.ALREADY_WRITTEN:
+                    self.write_log.record(
+                        task.id, tag_uid, task.url, True, duration, nfc_service.ALREADY_WRITTEN
+                    )
+                    if self.tag_bindings.lookup(tag_uid) is None:
+                        self.tag_bindings.bind(tag_uid, task.id, task.url)
+                    polling_active = False
+                    self.root.after(0, lambda: handle_already_written(tag_uid))
+                    self.log(f"Tag {tag_uid} already holds {task.url}")
+                    return
+                self.write_log.record(task.id, tag_uid, task.url, success, duration)
+                if success:
+                    self.tag_bindings.bind(tag_uid, task.id, task.url)
                     # Success
                     polling_active = False
                     self.root.after(0, lambda: handle_write_result(True))
                     self.log(
-                        f"Successfully wrote URL: {task['url']} for task {task['title']}"
+                        f"Successfully wrote URL: {task.url} for task {task.title}"
                     )
                 else:
                     # Failed for some reason
@@ -835,12 +974,23 @@ class NFCApp:
                             False, "Failed to write to tag. Please try again."
                         ),
                     )
-                    self.log(f"Failed to write URL: {task['url']}")
+                    self.log(f"Failed to write URL: {task.url}")
             except Exception as e:
                 # Handle specific exceptions
                 polling_active = False
+                timed_out = isinstance(e, nfc_service.APDUTimeoutError)
+                self.write_log.record(
+                    task.id,
+                    tag_uid,
+                    task.url,
+                    False,
+                    time.monotonic() - started,
+                    "timeout" if timed_out else None,
+                )
                 error_msg = str(e)
-                if "0x80100069" in error_msg:
+                if timed_out:
+                    error_msg = "The reader stopped responding. It is being reset; please try again."
+                elif "0x80100069" in error_msg:
                     error_msg = "Tag was removed during writing. Please keep it steady on the reader."
                 elif "0x80100066" in error_msg:
                     error_msg = "No tag detected. Please place a tag on the reader."
@@ -850,6 +1000,20 @@ class NFCApp:
                 self.log(f"Error: {error_msg}")
                 self.root.after(0, lambda: handle_write_result(False, error_msg))
 
+        def handle_already_written(uid):
+            """The tag was programmed before; bring its order's status up to date."""
+            progress.stop()
+            status_var.set("Already written - tag holds this URL")
+            instruction_label.configure(text="No write was needed")
+
+            # The tag belongs to whichever order it was last written for
+            order_id = self.tag_bindings.lookup(uid)["order_id"]
+            order = self.order_snapshot.get(order_id)
+            if order is None or order.status != "Success":
+                self.update_task_status(order_id, "Success")
+
+            write_dialog.after(2000, write_dialog.destroy)
+
         def handle_write_result(success, error_msg=None):
             """Handle the result of the write operation."""
             nonlocal polling_active, tag_detected
@@ -860,7 +1024,7 @@ class NFCApp:
                 instruction_label.configure(text="Tag has been successfully programmed")
 
                 # Update task status in the list
-                self.update_task_status(task["id"], "Success")
+                self.update_task_status(task.id, "Success")
 
                 # Auto-close after success
                 write_dialog.after(2000, write_dialog.destroy)
@@ -887,15 +1051,148 @@ class NFCApp:
         # Start polling for tags immediately
         poll_for_tag()
 
+    def batch_write(self):
+        """Write the listed pending orders to tags one after another."""
+        queue = [task for task in self.tasks if task.status == "Pending"]
+        if not queue:
+            messagebox.showinfo("Batch Write", "There are no pending orders in the list.")
+            return
+
+        # Use every attached reader as a write head, once read mode's workers are done with them
+        self.reader_manager.stop(wait=True)
+        heads = self.reader_manager.connect() or [self.nfc_reader]
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Batch Write")
+        dialog.geometry("460x280")
+        dialog.transient(self.root)
+        dialog.grab_set()
+
+        ttk.Label(dialog, text="Batch Write", font=("Arial", 14, "bold")).pack(pady=(15, 5))
+        order_var = tk.StringVar()
+        ttk.Label(dialog, textvariable=order_var, font=("Arial", 12, "bold")).pack(pady=2)
+        url_var = tk.StringVar()
+        ttk.Label(dialog, textvariable=url_var, font=("Arial", 10)).pack(pady=2)
+        progress_var = tk.StringVar()
+        ttk.Label(dialog, textvariable=progress_var, font=("Arial", 11)).pack(pady=5)
+        rate_var = tk.StringVar(value="Tags/min: -")
+        ttk.Label(dialog, textvariable=rate_var, font=("Arial", 11)).pack(pady=2)
+        event_var = tk.StringVar(
+            value="Place the first tag on the reader..."
+            if len(heads) == 1
+            else f"Place tags on any of the {len(heads)} readers..."
+        )
+        ttk.Label(dialog, textvariable=event_var, font=("Arial", 11, "bold")).pack(pady=10)
+
+        def show_progress():
+            order = writer.current()
+            if order is not None:
+                order_var.set(f"Next: {order.order_number} - {order.customer_name}")
+                url_var.set(order.url)
+            else:
+                order_var.set("All orders written")
+                url_var.set("")
+            progress_var.set(
+                f"{writer.written} / {len(writer.orders)} written, {writer.failed} failed"
+            )
+            rate = writer.tags_per_minute()
+            rate_var.set(f"Tags/min: {rate:.1f}" if rate else "Tags/min: -")
+
+        def handle_event(event, order, uid, reader):
+            if event == "written":
+                self.status_executor.submit(self.save_batch_status, order.id, "Success")
+                message = f"Wrote {order.order_number} to {uid}"
+                if len(heads) > 1:
+                    message += f" on {reader}"
+            elif event == "failed":
+                message = f"Write failed for {order.order_number}, present a tag again"
+            elif event == "already":
+                if order is not None:
+                    self.status_executor.submit(self.save_batch_status, order.id, "Success")
+                    message = f"Tag {uid} already holds {order.order_number}, marked it written"
+                else:
+                    message = f"Tag {uid} already holds another order, use a new tag"
+            elif event == "skipped":
+                message = f"Tag {uid} was already written, use a new tag"
+            elif event == "reissued":
+                message = f"Warning: tag {uid} was issued before, overwriting it with {order.order_number}"
+            elif event == "invalid":
+                message = f"Skipped {order.order_number}: its URL can't be written to a tag"
+            else:
+                message = "Batch finished"
+            self.log(message)
+
+            def update():
+                if dialog.winfo_exists():
+                    event_var.set(message)
+                    show_progress()
+
+            self.root.after(0, update)
+
+        writer = BatchWriter(heads, queue, handle_event, write_log=self.write_log, bindings=self.tag_bindings)
+
+        def on_close():
+            writer.stop()
+            dialog.destroy()
+
+        ttk.Button(dialog, text="Stop", command=on_close).pack(pady=5)
+        dialog.protocol("WM_DELETE_WINDOW", on_close)
+
+        show_progress()
+        self.log(f"Batch write started with {len(queue)} orders on {len(heads)} reader(s)")
+        writer.start()
+
+    def save_batch_status(self, task_id, status):
+        """Record a batch write's status in the background, then show it."""
+        if self.save_task_status(task_id, status):
+            self.root.after(0, lambda: self.show_task_status(task_id, status))
+
     def update_task_status(self, task_id, status):
         """Update the status of a task in the list and database."""
-        # Update via API
-        self.api.update_order_status(task_id, status)
-
+        if self.save_task_status(task_id, status):
+            self.show_task_status(task_id, status)
+
+    def save_task_status(self, task_id, status):
+        """Update an order's status via the API; returns True on success.
+
+        The update only applies if nobody changed the order since we synced
+        it. If someone did, their change is pulled in first: when it left
+        the status alone ours is applied on top of it, and when it changed
+        the status theirs stands.
+        """
+        task = self.order_snapshot.get(task_id)
+        expected_version = task.version if task else None
+        version = self.api.update_order_status(task_id, status, expected_version=expected_version)
+        if not version:
+            self.log(f"Order {task_id} was changed elsewhere, merging")
+            self.sync_orders()
+            latest = self.order_snapshot.get(task_id)
+            if latest is None:
+                self.log(f"Could not update status of order {task_id}: it was deleted")
+                return False
+            if latest.status == status:
+                return True
+            if task is not None and latest.status != task.status:
+                self.log(f"Order {task_id} was set to {latest.status} elsewhere, keeping that")
+                return False
+            version = self.api.update_order_status(task_id, status, expected_version=latest.version)
+            if not version:
+                self.log(f"Could not update status of order {task_id}")
+                return False
+            task = latest
+
+        # Keep our copy at the version we just wrote, so our next update doesn't look like a conflict
+        if task is not None:
+            task.status = status
+            task.version = version
+        return True
+
+    def show_task_status(self, task_id, status):
+        """Show a new status in the task list."""
         # Update the task in the tasks list
         for task in self.tasks:
-            if task["id"] == task_id:
-                task["status"] = status
+            if task.id == task_id:
+                task.status = status
                 break
 
         # Find the item in the treeview
@@ -949,31 +1246,47 @@ class NFCApp:
         self.date_filter_var.set(datetime.now().strftime("%Y-%m-%d"))
         self.fetch_tasks()
 
-    def format_card(self):
-        """Format/erase the current NFC tag."""
-        if messagebox.askyesno("Format Card", "Are you sure you want to format this NFC tag? This will erase all data on the tag."):
-            self.log("Starting card format operation...")
-            
-            # Check if a tag is present
-            uid = self.nfc_reader.read_uid()
-            if not uid:
-                messagebox.showerror("Format Error", "No NFC tag detected. Please place a tag on the reader.")
-                return
-                
-            # Attempt to format the card
-            if self.nfc_reader.format_card():
+    def format_card(self, full=False):
+        """Format the current NFC tag; ``full`` zeroes all of its user memory."""
+        title = "Secure Erase" if full else "Format Card"
+        if not messagebox.askyesno(title, "Are you sure you want to format this NFC tag? This will erase all data on the tag."):
+            self.log("Format operation cancelled.")
+            return
+
+        self.log("Starting card format operation...")
+        timeout = FULL_ERASE_TIMEOUT if full else nfc_service.TAG_OPERATION_TIMEOUT
+
+        def run_format():
+            # Erasing and verifying can take seconds, so keep it off the Tk thread
+            uid = None
+            try:
+                uid = self.nfc_reader.read_uid()
+                formatted = bool(uid) and self.nfc_reader.format_card(timeout, full=full)
+                if formatted:
+                    # The tag no longer holds its order's URL
+                    self.tag_bindings.unbind(uid)
+                error = None if uid else "No NFC tag detected. Please place a tag on the reader."
+            except nfc_service.APDUTimeoutError:
+                formatted = False
+                error = "The reader stopped responding. It is being reset; please try again."
+            self.root.after(0, lambda: finish(uid, formatted, error))
+
+        def finish(uid, formatted, error):
+            if formatted:
                 messagebox.showinfo("Format Complete", "The NFC tag has been successfully formatted.")
-                
+
                 # Update the display
                 self.uid_var.set(uid)  # Keep showing the UID
                 self.url_var.set("Empty (Formatted)")  # Show that the tag is now empty
                 self.log(f"Successfully formatted tag with UID: {uid}")
+            elif error:
+                messagebox.showerror("Format Error", error)
+                self.log(f"Format operation failed: {error}")
             else:
                 messagebox.showerror("Format Error", "Failed to format the NFC tag. Please try again.")
                 self.log("Format operation failed.")
-        else:
-            self.log("Format operation cancelled.")
 
+        threading.Thread(target=run_format, daemon=True).start()
 
 if __name__ == "__main__":
     root = tk.Tk()
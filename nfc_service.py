@@ -4,101 +4,637 @@ from smartcard.System import readers
 from smartcard.util import toHexString
 from datetime import datetime
 import threading
+import random
+import json
+import os
 import time
 import re
+import queue
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import ndef
+import write_pacing
+from order import Order
 
 
-class FakeAPI:
-    """Simulate a fake API returning tasks for today."""
+TASKS_URL = "https://tap-on-it.com/api/profiles/getToday/"
+TASK_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "task_cache")
+# Seconds a single APDU may take before the reader is treated as wedged
+APDU_TIMEOUT = 1.0
+# Seconds a whole tag write or read may take
+TAG_OPERATION_TIMEOUT = 5.0
+# Seconds between background reconnects of a reader with no supervisor
+RECONNECT_INTERVAL = 2.0
+# Extra attempts for a page the reader refused
+PAGE_WRITE_RETRIES = 2
+# SW1 of a write the tag NAKed (63xx); other error statuses (6A82, 6B00,
+# 6A86...) mean a bad page or parameter and are neither retried nor paced
+WRITE_NAK_SW1 = 0x63
+# Rewrite-and-check rounds after a read-back shows wrong pages
+VERIFY_RETRIES = 2
+# Largest READ BINARY length (Le) we ask a reader for in one APDU
+MAX_READ_LENGTH = 0xF0
+# Returned (truthy) by write_ndef_image when the tag already had the URL
+ALREADY_WRITTEN = "already written"
 
-    @staticmethod
-    def fetch_tasks():
+
+class TaskFetchError(Exception):
+    """Raised when the tasks endpoint can't be reached or returns an error."""
+
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class APDUTimeoutError(TimeoutError):
+    """Raised when a reader operation misses its deadline."""
+
+
+class APDUWorker:
+    """Runs reader calls on a daemon thread so a wedged one can be abandoned."""
+
+    def __init__(self):
+        self.calls = queue.Queue()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def submit(self, func, *args):
+        future = Future()
+        self.calls.put((future, func, args))
+        return future
+
+    def shutdown(self):
+        # Picked up after the current call, if it ever returns
+        self.calls.put((None, None, None))
+
+    def run(self):
+        while True:
+            future, func, args = self.calls.get()
+            if future is None:
+                return
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+class TaskCache:
+    """On-disk cache of the last good task list for each date.
+
+    An entry is one JSON object, written with its header (date and
+    validators) on the first line and one task per line after it, so the
+    validators can be read and the tasks streamed back without loading the
+    whole list.
+    """
+
+    def __init__(self, cache_dir=TASK_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def path_for(self, date):
+        return os.path.join(self.cache_dir, f"tasks-{date}.json")
+
+    def load(self, date):
+        """Return the cached entry for a date, or None if there isn't one."""
+        try:
+            with open(self.path_for(date), "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def validators(self, date):
+        """The cached ``(etag, last_modified)`` for a date, or None."""
+        try:
+            with open(self.path_for(date), "r") as f:
+                header = f.readline().rstrip("\n")
+            if not header.endswith(TaskCacheWriter.TASKS_START):
+                return None
+            entry = json.loads(header + "]}")
+        except (OSError, ValueError):
+            return None
+        return entry.get("etag"), entry.get("last_modified")
+
+    def iter_cached(self, date):
+        """Yield the cached tasks for a date one at a time."""
+        try:
+            with open(self.path_for(date), "r") as f:
+                if f.readline().rstrip("\n").endswith(TaskCacheWriter.TASKS_START):
+                    for line in f:
+                        line = line.strip().lstrip(",")
+                        if line and line != "]}":
+                            yield json.loads(line)
+                    return
+        except (OSError, ValueError):
+            return
+        # Written before entries were one task per line
+        entry = self.load(date)
+        for task in entry["tasks"] if entry else []:
+            yield task
+
+    def writer(self, date, etag=None, last_modified=None):
+        """Start a new entry for a date; it replaces the old one on ``commit``."""
+        header = {
+            "date": date,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        return TaskCacheWriter(self.path_for(date), header)
+
+    def store(self, date, tasks, etag=None, last_modified=None):
+        """Save a task list and its validators, replacing the old entry atomically."""
+        writer = self.writer(date, etag, last_modified)
+        for task in tasks:
+            writer.add(task)
+        writer.commit()
+
+
+class TaskCacheWriter:
+    """Streams a task list into a cache entry.
+
+    Tasks go to a temporary file as they arrive; ``commit`` swaps it in and
+    ``abort`` throws it away, so an interrupted listing never replaces the
+    last complete one. Disk errors are reported once and only cost the
+    cache write.
+    """
+
+    TASKS_START = '"tasks": ['
+
+    def __init__(self, path, header):
+        self.path = path
+        # Per writer, so overlapping listings for a date never share a file
+        self.tmp_path = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        self.count = 0
+        self.file = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.file = open(self.tmp_path, "w")
+            self.file.write(json.dumps(header)[:-1] + ", " + self.TASKS_START + "\n")
+        except OSError as e:
+            self.fail(e)
+
+    def fail(self, error):
+        print(f"Error saving task cache: {error}")
+        self.abort()
+
+    def add(self, task):
+        if self.file is None:
+            return
+        try:
+            self.file.write(("," if self.count else "") + json.dumps(task) + "\n")
+            self.count += 1
+        except OSError as e:
+            self.fail(e)
+
+    def commit(self):
+        if self.file is None:
+            return
+        try:
+            self.file.write("]}\n")
+            self.file.close()
+            self.file = None
+            os.replace(self.tmp_path, self.path)
+        except OSError as e:
+            self.fail(e)
+
+    def abort(self):
+        if self.file is not None:
+            try:
+                self.file.close()
+            except OSError:
+                pass
+            self.file = None
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+class TaskClient:
+    """Keep-alive HTTP client for the tasks endpoint.
+
+    Reuses one pooled ``requests.Session``, applies connect/read timeouts,
+    retries transient failures with jittered exponential backoff and
+    revalidates the last list with ``If-None-Match``/``If-Modified-Since``
+    so an unchanged list costs a 304 instead of a full download.
+    """
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        url=TASKS_URL,
+        connect_timeout=3.05,
+        read_timeout=10,
+        max_retries=3,
+        backoff=0.5,
+        cache=None,
+    ):
+        self.url = url
+        self.cache = cache
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = None
+        self.lock = threading.Lock()
+
+        # Validators and body of the last good response for cache_date
+        self.cache_date = None
+        self.etag = None
+        self.last_modified = None
+        self.tasks = None
+
+    def get_session(self):
+        """Create the pooled session on first use."""
+        if self.session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            self.session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
+        return self.session
+
+    def close(self):
+        """Close pooled connections."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def backoff_delay(self, attempt):
+        """Exponential backoff with full jitter for the given retry attempt."""
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def load_cached(self, date=None):
+        """Load the cached list for a date (today by default) without the network."""
+        date = date or datetime.now().strftime("%Y-%m-%d")
+        entry = self.cache.load(date) if self.cache else None
+
+        with self.lock:
+            self.cache_date = date
+            if entry:
+                self.tasks = entry["tasks"]
+                self.etag = entry.get("etag")
+                self.last_modified = entry.get("last_modified")
+            else:
+                self.tasks = None
+                self.etag = None
+                self.last_modified = None
+            return self.tasks
+
+    def request(self, params=None, headers=None, stream=False):
+        """GET the endpoint with retries; returns a 200 or 304 response."""
         import requests
-        from datetime import datetime
 
-        # Get current date in YYYY-MM-DD format for filtering
+        session = self.get_session()
+        error = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff_delay(attempt - 1))
+            try:
+                response = session.get(
+                    self.url,
+                    params=params,
+                    headers=headers,
+                    stream=stream,
+                    timeout=(self.connect_timeout, self.read_timeout),
+                )
+            except requests.RequestException as e:
+                error = TaskFetchError(f"Error fetching tasks: {e}")
+                continue
+
+            if response.status_code in (200, 304):
+                return response
+
+            response.close()
+            error = TaskFetchError(
+                f"API call failed with status code: {response.status_code}",
+                status_code=response.status_code,
+            )
+            if response.status_code not in self.RETRY_STATUS_CODES:
+                break
+
+        raise error
+
+    def fetch(self):
+        """Fetch the task list, revalidating the cached copy if there is one."""
+        # The endpoint returns today's tasks, so validators don't carry over days
         today = datetime.now().strftime("%Y-%m-%d")
-        
+        if self.cache_date != today:
+            self.load_cached(today)
+
+        with self.lock:
+            headers = {}
+            if self.tasks is not None:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+
+        response = self.request(headers=headers)
+        if response.status_code == 304:
+            with self.lock:
+                return self.tasks
+
         try:
-            # Call the API to get today's tasks
-            response = requests.get("https://tap-on-it.com/api/profiles/getToday/")
-            
-            # Check if request was successful
-            if response.status_code == 200:
-                # Parse the JSON response
-                data = response.json()
-                return data
-            else:
-                # If API call fails, return fallback data
-                print(f"API call failed with status code: {response.status_code}")
-                return []
-        except Exception as e:
-            # Handle any exceptions (network issues, etc.)
-            print(f"Error fetching tasks: {e}")
-            # Return fallback data with current date
-            return [
-                {
-                    "id": 1,
-                    "title": "Process Product Tag A",
-                    "url": "https://example.com/product/a",
-                    "tag_color": "#FF5733",
-                    "date": today,
-                },
-                {
-                    "id": 2,
-                    "title": "Update Inventory Tag B",
-                    "url": "https://store.com/inventory/b",
-                    "tag_color": "#33FF57",
-                    "date": today,
-                },
-                {
-                    "id": 3,
-                    "title": "Customer Loyalty Tag C",
-                    "url": "https://loyalty.com/reward/c",
-                    "tag_color": "#3357FF",
-                    "date": today,
-                },
-                {
-                    "id": 4,
-                    "title": "Old Task",
-                    "url": "https://example.com/old",
-                    "tag_color": "#FF33A1",
-                    "date": "2025-05-16",  # Keep this as an old task for testing
-                },
-            ]
+            tasks = response.json()
+        except ValueError as e:
+            raise TaskFetchError(f"Invalid task data: {e}")
+        with self.lock:
+            self.tasks = tasks
+            self.etag = response.headers.get("ETag")
+            self.last_modified = response.headers.get("Last-Modified")
+        if self.cache:
+            self.cache.store(today, tasks, self.etag, self.last_modified)
+        return tasks
+
+    def iter_tasks(self, date, page_size=100):
+        """Yield the tasks for a date one at a time, page by page.
+
+        The date and page cursor are sent as query parameters so the server
+        does the filtering. Each page is a JSON array parsed incrementally as
+        it streams in; the cursor for the next page comes back in the
+        ``X-Next-Cursor`` header and an absent header ends the listing.
+
+        The first page is requested conditionally with the validators of
+        the cached listing for the date; a 304 streams the cached tasks
+        back instead. A fresh listing is written to the cache as it streams
+        and only replaces the cached one once every page has arrived.
+        """
+        import requests
+
+        headers = {}
+        validators = self.cache.validators(date) if self.cache else None
+        if validators:
+            etag, last_modified = validators
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        cursor = None
+        writer = None
+        try:
+            while True:
+                params = {"date": date, "limit": page_size}
+                if cursor:
+                    params["cursor"] = cursor
+
+                response = self.request(params=params, headers=headers, stream=True)
+                if response.status_code == 304:
+                    response.close()
+                    yield from self.cache.iter_cached(date)
+                    return
+                # Validators describe the listing as of its first page
+                headers = {}
+                if writer is None and self.cache:
+                    writer = self.cache.writer(
+                        date, response.headers.get("ETag"), response.headers.get("Last-Modified")
+                    )
+
+                try:
+                    response.encoding = response.encoding or "utf-8"
+                    chunks = response.iter_content(chunk_size=8192, decode_unicode=True)
+                    for task in iter_json_array(chunks):
+                        if writer is not None:
+                            writer.add(task)
+                        yield task
+                    cursor = response.headers.get("X-Next-Cursor")
+                except requests.RequestException as e:
+                    raise TaskFetchError(f"Error fetching tasks: {e}")
+                except ValueError as e:
+                    raise TaskFetchError(f"Invalid task data: {e}")
+                finally:
+                    response.close()
+
+                if not cursor:
+                    break
+
+            if writer is not None:
+                writer.commit()
+                writer = None
+        finally:
+            # Failed or abandoned part way: keep the last complete listing
+            if writer is not None:
+                writer.abort()
+
+
+def iter_json_array(chunks):
+    """Yield the elements of a JSON array as its text arrives in chunks."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+
+    for chunk in chunks:
+        buffer += chunk
+        pos = 0
+        while True:
+            # Skip whitespace and the separators between elements
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("Expected a JSON array")
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                return
+
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                # Element is incomplete, wait for the next chunk
+                break
+
+            # A bare number at the end of the buffer may still be growing
+            if end == len(buffer) and not isinstance(item, (dict, list, str)):
+                break
+
+            yield item
+            pos = end
+
+        # Only keep the unparsed tail so memory stays bounded by one element
+        buffer = buffer[pos:]
+
+    if not started or buffer.strip():
+        raise ValueError("Unexpected end of JSON array")
+
+
+class FakeAPI:
+    """Simulate a fake API returning tasks for today."""
+
+    client = TaskClient(cache=TaskCache())
+
+    @classmethod
+    def cached_tasks(cls, date=None):
+        """Return the last good task list from disk, or None."""
+        if date is None:
+            tasks = cls.client.load_cached()
+        else:
+            entry = cls.client.cache.load(date)
+            tasks = entry["tasks"] if entry else None
+        if tasks is None:
+            return None
+        return [Order.from_dict(task) for task in tasks]
+
+    @classmethod
+    def iter_tasks(cls, date):
+        """Stream the tasks for a date, falling back to stale data on failure.
+
+        Only a complete listing from the server reaches the cache; stale
+        tasks yielded here never do. The ``TaskFetchError`` is raised when
+        nothing is cached, and when the listing broke off part way, so the
+        caller doesn't take the tasks it got for the whole day.
+        """
+        yielded = False
+        try:
+            for task in cls.client.iter_tasks(date):
+                yielded = True
+                yield Order.from_dict(task)
+        except TaskFetchError as e:
+            print(e)
+            if yielded:
+                raise
+            stale = cls.cached_tasks(date)
+            if stale is None:
+                raise
+            for task in stale:
+                if task.date == date:
+                    yield task
+
+    @classmethod
+    def fetch_tasks(cls):
+        """Today's tasks, or the last good list while the API is down.
+
+        Raises ``TaskFetchError`` when the API fails and nothing is cached.
+        """
+        try:
+            return [Order.from_dict(task) for task in cls.client.fetch()]
+        except TaskFetchError as e:
+            print(e)
+            # Serve the stale list rather than nothing while the API is down
+            if cls.client.tasks is not None:
+                return [Order.from_dict(task) for task in cls.client.tasks]
+            raise
 
 
 class NFCReader:
     """Handle NFC reader operations."""
 
-    def __init__(self, log_callback):
-        self.reader = None
+    def __init__(self, log_callback, reader=None):
+        # With a reader given, always use it; otherwise the first one attached
+        self.pinned_reader = reader
+        self.reader = reader
         self.connection = None
+        # pyscard opens a PC/SC context per connection object, so the object
+        # is kept across reconnects to the same reader and only its card
+        # handle is reopened
+        self.pcsc_connection = None
+        # (connection, thread) of the last off-thread disconnect
+        self.closing = None
+        # Set while reconnect_later's thread is running
+        self.reconnecting = False
+        self.reconnect_lock = threading.Lock()
+        # Set by ReaderSupervisor, which then owns reconnecting
+        self.supervisor = None
         self.log_callback = log_callback
         self.GET_UID = [0xFF, 0xCA, 0x00, 0x00, 0x00]
         self.DISABLE_BEEP = [0xFF, 0x00, 0x52, 0x00, 0x00]
+        # Tag type NDEF images are encoded for (see ndef.TAG_CAPACITIES)
+        self.tag_type = "NTAG213"
+        self.apdu_timeout = APDU_TIMEOUT
+        # APDUs run here so the caller can stop waiting on a wedged reader
+        self.apdu_worker = APDUWorker()
+        # Cleared if the reader won't return more than 16 bytes per READ BINARY
+        self.bulk_read = True
+        # (SW1, SW2) of the last write_block that got an answer from the reader
+        self.write_status = None
+
+    def pick_reader(self):
+        if self.pinned_reader is not None:
+            return self.pinned_reader
+        reader_list = readers()
+        return reader_list[0] if reader_list else None
 
-    def connect(self):
+    def connect(self, reader=None):
         try:
-            reader_list = readers()
-            if not reader_list:
+            reader = reader or self.pick_reader()
+            if reader is None:
                 self.log_callback("No NFC readers found!")
                 return False
-            self.reader = reader_list[0]
-            self.log_callback(f"Connected to reader: {self.reader}")
-            self.connection = self.reader.createConnection()
-            self.connection.connect()
+            self.log_callback(f"Connected to reader: {reader}")
+            connection = self.reusable_connection(reader)
+            if connection is None:
+                connection = reader.createConnection()
+            self.reader = reader
+            self.pcsc_connection = connection
+            connection.connect()
+            self.connection = connection
             self.log_callback("Reader connection established.")
             return True
         except Exception as e:
             self.log_callback(f"Error connecting to reader: {e}")
             return False
 
+    def reusable_connection(self, reader):
+        """The kept connection object for ``reader`` once its old handle is closed, or None."""
+        connection = self.pcsc_connection
+        if connection is None:
+            return None
+        if str(reader) != str(self.reader):
+            self.pcsc_connection = None
+            self.release(connection, discard=True)
+            return None
+        if self.connection is connection:
+            self.release(connection)
+        if self.closing is not None and self.closing[0] is connection:
+            thread = self.closing[1]
+            thread.join(self.apdu_timeout)
+            if thread.is_alive():
+                # Still stuck closing the old handle; start over with a new context
+                self.pcsc_connection = None
+                return None
+        return connection
+
+    def release(self, connection, discard=False):
+        """Drop ``connection`` and disconnect it off-thread.
+
+        Disconnecting can block on a wedged reader, so nobody waits for it
+        here; ``connect`` waits before reopening the same object. With
+        ``discard`` the connection's PC/SC context is released too.
+        """
+        if connection is None:
+            return
+        if self.connection is connection:
+            self.connection = None
+
+        def disconnect():
+            try:
+                connection.disconnect()
+            except Exception:
+                pass
+            if discard and hasattr(connection, "release"):
+                try:
+                    connection.release()
+                except Exception:
+                    pass
+
+        thread = threading.Thread(target=disconnect, daemon=True)
+        self.closing = (connection, thread)
+        thread.start()
+
     def disconnect(self):
+        # Stops a background reconnect after its current attempt
+        self.reconnecting = False
         if self.connection:
             try:
                 self.connection.disconnect()
                 self.connection = None
+                self.pcsc_connection = None
                 self.reader = None
             except Exception as e:
                 self.log_callback(f"Error disconnecting: {e}")
@@ -108,7 +644,7 @@ class NFCReader:
             self.log_callback("Reader not connected!")
             return False
         try:
-            _, sw1, sw2 = self.connection.transmit(self.DISABLE_BEEP)
+            _, sw1, sw2 = self.transmit(self.DISABLE_BEEP)
             if (sw1, sw2) == (0x90, 0x00):
                 self.log_callback("Beep disabled successfully.")
                 return True
@@ -118,13 +654,13 @@ class NFCReader:
             self.log_callback(f"Error disabling beep: {e}")
             return False
 
-    def read_uid(self):
+    def read_uid(self, deadline=None):
         if not self.connection:
             # Silently return None if not connected
             return None
             
         try:
-            data, sw1, sw2 = self.connection.transmit(self.GET_UID)
+            data, sw1, sw2 = self.transmit(self.GET_UID, deadline)
             if (sw1, sw2) == (0x90, 0x00):
                 uid = toHexString(data).replace(" ", "")
                 # Only log successful reads
@@ -133,53 +669,115 @@ class NFCReader:
             if (sw1, sw2) not in [(0x63, 0x00), (0x62, 0x82)]:
                 self.log_callback(f"Error reading UID: SW1={sw1:02X}, SW2={sw2:02X}")
             return None
+        except APDUTimeoutError:
+            raise
         except Exception as e:
             error_str = str(e)
             # Handle specific error cases
             if "card not connected" in error_str.lower():
                 # Card not connected - attempt to reconnect
-                try:
-                    self.connection = None
-                    reader_list = readers()
-                    if reader_list:
-                        self.reader = reader_list[0]
-                        self.connection = self.reader.createConnection()
-                        self.connection.connect()
-                except:
-                    # If reconnection fails, just ignore it and return None
-                    pass
+                self.connection_lost(e)
                 return None
             elif "0x80100069" in error_str or "card has been removed" in error_str.lower():
                 # Card removal errors - try to reconnect silently
+                connection = self.connection
                 try:
-                    self.connection.disconnect()
-                    self.connection.connect()
+                    self.watchdog(connection, self.reset_card, connection, deadline=deadline)
+                except APDUTimeoutError:
+                    raise
                 except:
                     # If reconnection fails, just ignore it
                     pass
                 return None
             elif "connection" in error_str.lower():
                 # Generic connection errors
-                try:
-                    # Try to reconnect silently
-                    self.connection.disconnect()
-                    self.connection.connect()
-                except:
-                    # If reconnection fails, just ignore it
-                    pass
+                self.connection_lost(e)
                 return None
             else:
                 # Other errors - log them but don't spam
                 self.log_callback(f"Error reading UID: {e}")
                 return None
 
-    def read_block(self, block_num):
+    def transmit(self, command, deadline=None):
+        """Send an APDU, giving up after ``apdu_timeout`` or at ``deadline``.
+
+        ``deadline`` is a ``time.monotonic()`` value for the whole operation
+        the APDU belongs to. If the reader doesn't answer in time the card
+        connection is dropped and reported lost, and ``APDUTimeoutError`` is
+        raised.
+        """
+        connection = self.connection
+        return self.watchdog(connection, connection.transmit, command, deadline=deadline)
+
+    def watchdog(self, connection, func, *args, deadline=None):
+        """Run a call on ``connection`` on the APDU thread, aborting it if it hangs."""
+        timeout = self.apdu_timeout
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                raise APDUTimeoutError("Operation deadline passed")
+
+        future = self.apdu_worker.submit(func, *args)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self.abort(connection)
+            raise APDUTimeoutError(f"Reader did not answer within {timeout:.2f}s")
+
+    @staticmethod
+    def reset_card(connection):
+        connection.disconnect()
+        connection.connect()
+
+    def abort(self, connection):
+        """Abandon a connection whose APDU is stuck."""
+        # The stuck call keeps its thread; later APDUs get a fresh one
+        stuck = self.apdu_worker
+        self.apdu_worker = APDUWorker()
+        stuck.shutdown()
+        # Don't reopen the wedged connection object; the next connect makes a new one
+        if self.pcsc_connection is connection:
+            self.pcsc_connection = None
+        self.release(connection, discard=True)
+        self.connection = None
+        self.log_callback("Reader stopped responding, resetting the connection")
+        self.connection_lost(APDUTimeoutError("reader stopped responding"))
+
+    def connection_lost(self, error):
+        """Recover from a reader-level failure."""
+        self.release(self.connection)
+        if self.supervisor is not None:
+            # Reconnects with backoff on its own thread, reusing the same reader
+            self.supervisor.report_failure(error)
+            return
+        # Never on the caller's thread: it may be the wedged reader abort just gave up on
+        self.reconnect_later()
+
+    def reconnect_later(self):
+        """Reconnect on a background thread until it works or ``disconnect`` is called.
+
+        ``connection`` stays None meanwhile, so reads return None. Only one
+        reconnect thread runs at a time.
+        """
+        with self.reconnect_lock:
+            if self.reconnecting:
+                return
+            self.reconnecting = True
+
+        def reconnect():
+            while self.reconnecting and not self.connect(self.pinned_reader):
+                time.sleep(RECONNECT_INTERVAL)
+            self.reconnecting = False
+
+        threading.Thread(target=reconnect, daemon=True).start()
+
+    def read_block(self, block_num, deadline=None):
         if not self.connection:
             # Silently return None if not connected
             return None
         try:
             command = [0xFF, 0xB0, 0x00, block_num, 0x10]
-            data, sw1, sw2 = self.connection.transmit(command)
+            data, sw1, sw2 = self.transmit(command, deadline)
             if (sw1, sw2) == (0x90, 0x00):
                 return data
             # Don't log common error codes that indicate no card present
@@ -188,6 +786,8 @@ class NFCReader:
                 if block_num < 6:
                     self.log_callback(f"Error reading block {block_num}: SW1={sw1:02X}, SW2={sw2:02X}")
             return None
+        except APDUTimeoutError:
+            raise
         except Exception as e:
             error_str = str(e)
             # Only log errors that aren't related to card removal
@@ -197,29 +797,99 @@ class NFCReader:
                     self.log_callback(f"Error reading block {block_num}: {e}")
             return None
 
-    def write_block(self, block_num, data):
+    def read_pages(self, start, count, deadline=None):
+        """Read ``count`` pages from ``start`` as bytes, or None if the tag can't be read.
+
+        The whole range comes back in one READ BINARY when the reader
+        accepts a longer Le; readers that only return 16 bytes at a time are
+        noticed on the first try and read 4 pages per APDU from then on.
+        """
+        if not self.connection:
+            return None
+        length = count * ndef.PAGE_SIZE
+        if self.bulk_read and length <= MAX_READ_LENGTH:
+            try:
+                data, sw1, sw2 = self.transmit([0xFF, 0xB0, 0x00, start, length], deadline)
+            except APDUTimeoutError:
+                raise
+            except Exception as e:
+                self.log_callback(f"Error reading pages {start}-{start + count - 1}: {e}")
+                return None
+            if (sw1, sw2) == (0x90, 0x00) and len(data) >= length:
+                return bytes(data[:length])
+            if (sw1, sw2) != (0x90, 0x00) and sw1 not in (0x67, 0x6C):
+                # Not a length problem; most likely the tag left the field
+                return None
+            self.log_callback("Reader returns 16 bytes per read; reading 4 pages at a time")
+            self.bulk_read = False
+
+        data = b""
+        for page in range(start, start + count, 4):
+            block = self.read_block(page, deadline)
+            if block is None:
+                return None
+            data += bytes(block[:16])
+        return data[:length]
+
+    def verify_pages(self, start, pages, deadline=None, digest=None, retries=VERIFY_RETRIES):
+        """Check pages written from ``start`` against what was meant to be written.
+
+        The range is read back in one go and its hash compared with
+        ``digest`` (computed from ``pages`` if not given). On a mismatch only
+        the pages that differ are rewritten before checking again.
+        """
+        expected = b"".join(bytes(page) for page in pages)
+        if digest is None:
+            digest = ndef.page_digest(expected)
+
+        for attempt in range(retries + 1):
+            data = self.read_pages(start, len(pages), deadline)
+            if data is None:
+                self.log_callback("Could not read the tag back to verify it")
+                return False
+            if ndef.page_digest(data) == digest:
+                return True
+
+            size = ndef.PAGE_SIZE
+            wrong = [i for i in range(len(pages)) if data[i * size : (i + 1) * size] != expected[i * size : (i + 1) * size]]
+            self.log_callback(f"Read-back mismatch on pages {', '.join(str(start + i) for i in wrong)}")
+            if attempt == retries:
+                break
+            for i in wrong:
+                if not self.write_page(start + i, pages[i], deadline):
+                    return False
+
+        self.log_callback("Tag content still differs after rewriting")
+        return False
+
+    def write_block(self, block_num, data, deadline=None):
+        self.write_status = None
         if not self.connection:
             self.log_callback("Reader not connected!")
             return False
         try:
-            command = [0xFF, 0xD6, 0x00, block_num, len(data)] + data
-            _, sw1, sw2 = self.connection.transmit(command)
+            command = [0xFF, 0xD6, 0x00, block_num, len(data)] + list(data)
+            _, sw1, sw2 = self.transmit(command, deadline)
+            self.write_status = (sw1, sw2)
             if (sw1, sw2) == (0x90, 0x00):
                 self.log_callback(f"Successfully wrote block {block_num}")
                 return True
             self.log_callback(f"Error writing block {block_num}: SW1={sw1}, SW2={sw2}")
             return False
+        except APDUTimeoutError:
+            raise
         except Exception as e:
             self.log_callback(f"Error writing block {block_num}: {e}")
             return False
 
-    def read_ntag_url(self):
+    def read_ntag_url(self, timeout=TAG_OPERATION_TIMEOUT):
+        deadline = time.monotonic() + timeout
         try:
             # First, dump the entire tag content for debugging
             self.log_callback("Reading tag data...")
             raw_dump = []
             for page in range(4, 24):  # NTAG data starts at page 4
-                data = self.read_block(page)
+                data = self.read_block(page, deadline)
                 if data:
                     raw_dump.append(data)
                     hex_data = ' '.join([f'{b:02X}' for b in data])
@@ -424,98 +1094,101 @@ class NFCReader:
         self.log_callback(f"Cleaned URL: {cleaned_url}")
         return cleaned_url
 
-    def write_ntag_url(self, url):
+    def write_ntag_url(self, url, skip_current=True):
         try:
             # Log the URL we're trying to write
             self.log_callback(f"Attempting to write URL: {url}")
             
-            # Make sure URL is properly formatted
-            if not url.startswith(('http://', 'https://')):
-                url = 'http://' + url
-                self.log_callback(f"Added http:// prefix: {url}")
-            
-            # Remove the http:// prefix for NDEF encoding (will be encoded as type 0x01)
-            if url.startswith('http://'):
-                actual_url = url[7:]  # Remove 'http://'
-                prefix_type = 0x01    # URI identifier for http://
-            elif url.startswith('https://'):
-                actual_url = url[8:]  # Remove 'https://'
-                prefix_type = 0x02    # URI identifier for https://
-            else:
-                actual_url = url
-                prefix_type = 0x00    # No prefix
-                
-            self.log_callback(f"URL after prefix removal: {actual_url}")
-            
-            # Ensure URL is ASCII-encodable (remove any non-ASCII characters)
-            actual_url = ''.join(c for c in actual_url if ord(c) < 128)
-            
-            # Encode the URL to ASCII bytes
-            try:
-                url_bytes = actual_url.encode("ascii")
-                self.log_callback(f"URL encoded successfully, length: {len(url_bytes)} bytes")
-            except UnicodeEncodeError as e:
-                self.log_callback(f"Error encoding URL: {e}")
-                # Try to strip non-ASCII characters
-                actual_url = ''.join(c for c in actual_url if ord(c) < 128)
-                url_bytes = actual_url.encode("ascii")
-                self.log_callback(f"Stripped non-ASCII characters, new URL: {actual_url}")
-            
-            # Create NDEF record
-            # The structure is:
-            # [0x03, length, 0xD1, 0x01, text_length, 0x55, prefix_type, ...URL data..., 0xFE]
-            ndef_length = len(url_bytes) + 5
-            ndef_header = [
-                0x03,        # NDEF record header
-                ndef_length, # Length of the NDEF record
-                0xD1,        # NDEF record type (URI)
-                0x01,        # Record type length
-                len(url_bytes) + 1, # Payload length (URL + URI identifier code)
-                0x55,        # 'U' - URI record type
-                prefix_type, # URI identifier code (0x01 = http://, 0x02 = https://)
-            ]
-            
-            # Combine header, URL data, and terminator
-            data = ndef_header + list(url_bytes) + [0xFE]
-            
+            # Normalized and encoded once per URL; the http:// or https:// prefix is a type code
+            image = ndef.url_image(url, self.tag_type)
+            if image.url != url.strip():
+                self.log_callback(f"Normalized URL: {image.url}")
+        except Exception as e:
+            self.log_callback(f"Error writing NTAG URL: {e}")
+            return False
+        return self.write_ndef_image(image, skip_current=skip_current)
+
+    def holds_url(self, image, deadline=None):
+        """Whether the tag's NDEF message already is ``image``'s URL.
+
+        Reads just the pages the image would take, in one APDU on readers
+        that allow it; a tag holding a different URL can't decode to the same
+        one from that range.
+        """
+        data = self.read_pages(ndef.FIRST_PAGE, len(image.pages), deadline)
+        return data is not None and ndef.decode_url(data) == image.url
+
+    def write_ndef_image(self, image, timeout=TAG_OPERATION_TIMEOUT, skip_current=True):
+        """Write a pre-encoded ``ndef.NdefImage`` to the tag.
+
+        Returns True once the tag is written and verified, False on failure,
+        or ``ALREADY_WRITTEN`` without writing anything when ``skip_current``
+        is set and the tag already holds the URL. Raises ``APDUTimeoutError``
+        if the reader stops answering or the write takes longer than
+        ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + timeout
+        try:
+            if skip_current and self.holds_url(image, deadline):
+                self.log_callback(f"Tag already holds {image.url}, not rewriting it")
+                return ALREADY_WRITTEN
+
             # Dump the data we're about to write for debugging
-            hex_data = ' '.join([f'{b:02X}' for b in data])
-            self.log_callback(f"Full NDEF data to write: {hex_data}")
-            
-            # Format the tag first to ensure it's clean
-            self.log_callback("Formatting tag before writing...")
-            empty_data = [0x00, 0x00, 0x00, 0x00]
-            for page in range(4, 8):  # Clear the first few pages
-                self.write_block(page, empty_data)
-            
-            # Split into 4-byte pages for NTAG
-            pages = [data[i : i + 4] for i in range(0, len(data), 4)]
-            
-            # Pad the last page if needed
-            if len(pages[-1]) < 4:
-                pages[-1].extend([0] * (4 - len(pages[-1])))
-            
-            # Write each page to the tag
-            for i, page_data in enumerate(pages):
-                page_num = i + 4  # Start at page 4
-                hex_page = ' '.join([f'{b:02X}' for b in page_data])
-                self.log_callback(f"Writing page {page_num}: {hex_page}")
-                if not self.write_block(page_num, page_data):
+            self.log_callback(f"Full NDEF data to write ({len(image.data)} bytes): {image.hex}")
+
+            # Write each 4-byte page to the tag; the terminator TLV at the end
+            # of the image makes whatever follows it on the tag irrelevant
+            for i, page_data in enumerate(image.pages):
+                page_num = i + ndef.FIRST_PAGE
+                if not self.write_page(page_num, page_data, deadline):
                     self.log_callback(f"Failed to write page {page_num}")
                     return False
-                
-                # Add a small delay between writes to ensure stability
-                import time
-                time.sleep(0.05)
+
+            if not self.verify_pages(ndef.FIRST_PAGE, image.pages, deadline, image.digest):
+                self.log_callback("Tag verification failed")
+                return False
             
-            self.log_callback(f"Successfully wrote URL to tag: {url}")
+            self.log_callback(f"Successfully wrote URL to tag: {image.url}")
             return True
+        except APDUTimeoutError:
+            raise
         except Exception as e:
             self.log_callback(f"Error writing NTAG URL: {e}")
             return False
+        finally:
+            write_pacing.profiles.save()
+
+    def write_page(self, page, data, deadline=None, retries=PAGE_WRITE_RETRIES):
+        """Write one page, paced for this reader model and retried if refused.
+
+        Pages go out back to back until the reader rejects one (a NAK, or the
+        tag moving off the field); the pacer then adds a delay between pages
+        for this model and eases it off again as writes succeed. A write
+        refused for a bad page or parameter fails at once without touching
+        the pacer, since waiting longer won't change the answer.
+        """
+        pacer = write_pacing.profiles.pacer_for(self.reader)
+        for attempt in range(retries + 1):
+            pacer.pace()
+            if self.write_block(page, data, deadline):
+                pacer.success()
+                return True
+            if self.write_status is not None and self.write_status[0] != WRITE_NAK_SW1:
+                break
+            pacer.failure()
+            if not self.connection:
+                break
+        return False
             
-    def format_card(self):
-        """Format/erase an NFC tag by writing empty data to all user pages."""
+    def format_card(self, timeout=TAG_OPERATION_TIMEOUT, full=False):
+        """Format an NFC tag, leaving an empty NDEF message on it.
+
+        By default only the pages the current NDEF message occupies (found
+        from its TLV length) are overwritten, which for a tag with one URL is
+        a handful of APDUs. ``full=True`` zeroes every user page of the tag
+        type instead, for tags that must not keep any old data.
+        """
+        deadline = time.monotonic() + timeout
         try:
             if not self.connection:
                 self.log_callback("Reader not connected!")
@@ -524,81 +1197,67 @@ class NFCReader:
             self.log_callback("Starting card format operation...")
             
             # First, read the tag UID to identify it
-            uid = self.read_uid()
+            uid = self.read_uid(deadline)
             if not uid:
                 self.log_callback("No tag detected for formatting")
                 return False
                 
             self.log_callback(f"Formatting tag with UID: {uid}")
             
-            # Empty data (all zeros)
-            empty_data = [0x00, 0x00, 0x00, 0x00]
-            
             # For NTAG213/215/216, user memory starts at page 4
             # NTAG213: pages 4-39 (36 pages)
             # NTAG215: pages 4-129 (126 pages)
             # NTAG216: pages 4-225 (222 pages)
-            
-            # First, completely clear the tag by writing zeros to all user pages
-            self.log_callback("Clearing all user memory...")
-            for page in range(4, 40):  # Cover at least NTAG213 size
-                try:
-                    self.write_block(page, empty_data)
-                    # Add a small delay between writes for stability
-                    import time
-                    time.sleep(0.02)
-                except Exception:
-                    # If we hit an error, we might have reached the end of the tag's memory
-                    break
-            
-            # Now write a proper empty NDEF message
-            self.log_callback("Writing empty NDEF structure...")
-            
-            # NDEF Message TLV (Type-Length-Value) format
-            # Type: 0x03 (NDEF Message)
-            # Length: 0x03 (3 bytes)
-            # Value: [0xD0, 0x00, 0x00] (Empty NDEF record)
-            #   0xD0: NDEF record header (TNF=0, IL=0, SR=1, CF=0, ME=1, MB=1)
-            #   0x00: Type length (0 bytes)
-            #   0x00: Payload length (0 bytes)
-            empty_ndef_header = [0x03, 0x03, 0xD0, 0x00]
-            
-            # Write the NDEF header to page 4
-            if not self.write_block(4, empty_ndef_header):
-                self.log_callback("Failed to write NDEF header")
-                return False
-                
-            # Write empty payload and terminator to page 5
-            ndef_terminator = [0x00, 0xFE, 0x00, 0x00]  # Last byte of empty NDEF + Terminator TLV
-            if not self.write_block(5, ndef_terminator):
-                self.log_callback("Failed to write NDEF terminator")
-                return False
-                
-            # Verify the format by reading back the first few pages
-            self.log_callback("Verifying format...")
-            page4 = self.read_block(4)
-            page5 = self.read_block(5)
-            
-            if page4 and page5:
-                page4_hex = ' '.join([f'{b:02X}' for b in page4])
-                page5_hex = ' '.join([f'{b:02X}' for b in page5])
-                self.log_callback(f"Page 4: {page4_hex}")
-                self.log_callback(f"Page 5: {page5_hex}")
-                
-                # Check if the NDEF structure was written correctly
-                if page4[0] == 0x03 and page5[1] == 0xFE:
-                    self.log_callback("Card format successful - proper NDEF structure verified")
+            capacity = ndef.TAG_CAPACITIES[self.tag_type]
+            if full:
+                # Size the erase from the tag itself, not the type we encode for
+                cc = self.read_pages(ndef.CC_PAGE, 1, deadline)
+                tag_type = ndef.tag_type_from_cc(cc) if cc is not None else None
+                if tag_type is None:
+                    self.log_callback("Couldn't identify the tag type; refusing a full erase")
+                    return False
+                self.log_callback(f"Tag type: {tag_type}")
+                capacity = ndef.TAG_CAPACITIES[tag_type]
+            used = capacity
+            if not full:
+                current = self.read_pages(ndef.FIRST_PAGE, 4, deadline)
+                if current is not None and current.startswith(ndef.EMPTY_MESSAGE):
+                    self.log_callback("Card format successful - tag already holds an empty NDEF message")
                     return True
+                extent = ndef.tlv_extent(current) if current is not None else None
+                if extent is None or extent > capacity:
+                    self.log_callback("Couldn't read the existing NDEF layout; clearing all user memory")
                 else:
-                    self.log_callback("Warning: Card formatted but NDEF structure verification failed")
-                    return True  # Still return true as the card is formatted
+                    used = max(extent, len(ndef.EMPTY_MESSAGE))
             else:
-                self.log_callback("Warning: Could not verify format, but operation completed")
-                return True
+                self.log_callback("Clearing all user memory...")
             
+            # Empty NDEF message (0xD0: MB, ME, SR, TNF=empty) and terminator,
+            # then zeros over the rest of the pages the old data used
+            pages = ndef.to_pages(ndef.EMPTY_MESSAGE)
+            pages += [[0x00, 0x00, 0x00, 0x00]] * (-(-used // ndef.PAGE_SIZE) - len(pages))
+            self.log_callback(f"Writing empty NDEF structure over {len(pages)} pages...")
+            for i, page_data in enumerate(pages):
+                if not self.write_page(ndef.FIRST_PAGE + i, page_data, deadline):
+                    self.log_callback(f"Failed to write page {ndef.FIRST_PAGE + i}")
+                    return False
+                
+            # Verify the format by reading back every page it wrote
+            self.log_callback("Verifying format...")
+            if not self.verify_pages(ndef.FIRST_PAGE, pages, deadline):
+                self.log_callback("Card format failed - NDEF structure verification failed")
+                return False
+            self.log_callback("Card format successful - proper NDEF structure verified")
+            return True
+            
+        except APDUTimeoutError as e:
+            self.log_callback(f"Format timed out: {e}")
+            return False
         except Exception as e:
             self.log_callback(f"Error formatting card: {e}")
             return False
+        finally:
+            write_pacing.profiles.save()
 
 
 class ReadModeWindow:
@@ -672,6 +1331,10 @@ class NFCDashboard:
         self.nfc = NFCReader(self.log)
         self.tasks = []
         self.next_task_id = 5  # Start after fake API IDs
+        self.task_date = "2025-05-17"
+        # Bumped by every fetch; a revalidation from an older one is dropped
+        self.task_generation = 0
+        self.revalidate_lock = threading.Lock()
         self.setup_ui()
         self.start_auto_connect()
         self.fetch_tasks()
@@ -789,26 +1452,93 @@ class NFCDashboard:
         threading.Thread(target=connect_loop, daemon=True).start()
 
     def fetch_tasks(self):
-        today = "2025-05-17"
-        tasks = FakeAPI.fetch_tasks()
-        self.tasks = [task for task in tasks if task["date"] == today]
-        self.task_count_var.set(f"Tasks for Today: {len(self.tasks)}")
+        """Render cached tasks immediately, then revalidate in the background."""
+        cached = FakeAPI.cached_tasks(self.task_date)
+        if cached is not None:
+            self.show_tasks(cached)
+        self.task_generation += 1
+        threading.Thread(
+            target=self.revalidate_tasks, args=(self.task_generation,), daemon=True
+        ).start()
 
-        for item in self.task_tree.get_children():
-            self.task_tree.delete(item)
+    def revalidate_tasks(self, generation, batch_size=50):
+        """Stream fresh tasks off the Tk thread and swap them in batch by batch.
 
-        for task in self.tasks:
-            self.task_tree.insert(
+        Runs one at a time; a run that a newer fetch superseded stops, and
+        its batches are never shown.
+        """
+        with self.revalidate_lock:
+            if generation != self.task_generation:
+                return
+            date = self.task_date
+            batch = []
+            first = True
+
+            tasks = FakeAPI.iter_tasks(date)
+            try:
+                for task in tasks:
+                    if generation != self.task_generation:
+                        return
+                    batch.append(task)
+                    if len(batch) >= batch_size:
+                        self.root.after(
+                            0, lambda b=batch, a=not first: self.show_task_batch(generation, b, a)
+                        )
+                        batch = []
+                        first = False
+            except TaskFetchError as e:
+                if first:
+                    # Nothing cached to fall back on; say so rather than show an empty day
+                    self.root.after(0, lambda e=e: self.show_fetch_error(e))
+                else:
+                    # Part of the day is on screen; put the last full list back
+                    self.root.after(0, lambda e=e: self.restore_cached_tasks(generation, date, e))
+                return
+            finally:
+                # Closing an abandoned stream leaves the cached listing as it was
+                tasks.close()
+
+            if batch or first:
+                self.root.after(
+                    0, lambda b=batch, a=not first: self.show_task_batch(generation, b, a)
+                )
+
+    def show_task_batch(self, generation, tasks, append):
+        if generation == self.task_generation:
+            self.show_tasks(tasks, append=append)
+
+    def restore_cached_tasks(self, generation, date, error):
+        if generation != self.task_generation:
+            return
+        self.log(f"Task list cut off, showing the last complete list: {error}")
+        self.show_tasks(FakeAPI.cached_tasks(date) or [])
+
+    def show_fetch_error(self, error):
+        self.log(f"Couldn't load tasks: {error}")
+        messagebox.showerror("Tasks", f"Couldn't load today's tasks.\n\n{error}")
+
+    def show_tasks(self, tasks, append=False):
+        """Show tasks in the list, replacing the current rows unless appending."""
+        if not append:
+            self.tasks = []
+            for item in self.task_tree.get_children():
+                self.task_tree.delete(item)
+
+        # The server filters by date already; this guards against one that doesn't
+        tasks = [task for task in tasks if task.date == self.task_date]
+        self.tasks.extend(tasks)
+        self.task_count_var.set(f"Tasks for Today: {len(self.tasks)}")
+
+        for task in tasks:
+            item = self.task_tree.insert(
                 "",
                 tk.END,
-                values=(task["id"], task["title"], task["url"], task["tag_color"]),
+                values=(task.id, task.title, task.url, task.tag_color),
             )
             self.task_tree.tag_configure(
-                f"color_{task['id']}", background=task["tag_color"]
-            )
-            self.task_tree.item(
-                self.task_tree.get_children()[-1], tags=(f"color_{task['id']}",)
+                f"color_{task.id}", background=task.tag_color
             )
+            self.task_tree.item(item, tags=(f"color_{task.id}",))
 
     def add_task(self):
         """Add a new task via modal."""
@@ -854,13 +1584,13 @@ class NFCDashboard:
                 return
             if not url.startswith(("http://", "https://")):
                 url = "http://" + url
-            task = {
-                "id": self.next_task_id,
-                "title": title,
-                "url": url,
-                "tag_color": color_var.get(),
-                "date": "2025-05-17",
-            }
+            task = Order(
+                id=self.next_task_id,
+                title=title,
+                url=url,
+                tag_color=color_var.get(),
+                date=self.task_date,
+            )
             self.tasks.append(task)
             self.next_task_id += 1
             self.fetch_tasks()  # Refresh task list
@@ -877,7 +1607,7 @@ class NFCDashboard:
             return
 
         task_id = self.task_tree.item(selected[0])["values"][0]
-        task = next((t for t in self.tasks if t["id"] == task_id), None)
+        task = next((t for t in self.tasks if t.id == task_id), None)
         if not task:
             messagebox.showerror("Error", "Task not found!")
             return
@@ -891,20 +1621,26 @@ class NFCDashboard:
         ttk.Label(modal, text="Write URL to NFC Tag", font=("Arial", 12, "bold")).pack(
             pady=10
         )
-        ttk.Label(modal, text=f"Task: {task['title']}", font=("Arial", 10)).pack()
-        ttk.Label(modal, text=f"URL: {task['url']}", font=("Arial", 10)).pack(pady=5)
+        ttk.Label(modal, text=f"Task: {task.title}", font=("Arial", 10)).pack()
+        ttk.Label(modal, text=f"URL: {task.url}", font=("Arial", 10)).pack(pady=5)
         ttk.Label(modal, text="Place NFC tag on reader...", font=("Arial", 10)).pack()
         status_var = tk.StringVar(value="")
         ttk.Label(modal, textvariable=status_var, font=("Arial", 10)).pack(pady=5)
 
         def write():
-            if self.nfc.write_ntag_url(task["url"]):
+            try:
+                written = self.nfc.write_ntag_url(task.url)
+            except APDUTimeoutError:
+                status_var.set("The reader stopped responding. Try again.")
+                self.log(f"Reader timed out writing URL: {task.url}")
+                return
+            if written:
                 status_var.set("Successfully wrote URL to tag!")
-                self.log(f"Wrote URL: {task['url']} for task {task['title']}")
+                self.log(f"Wrote URL: {task.url} for task {task.title}")
                 modal.after(1000, modal.destroy)
             else:
                 status_var.set("Failed to write URL. Try again.")
-                self.log(f"Failed to write URL: {task['url']}")
+                self.log(f"Failed to write URL: {task.url}")
 
         ttk.Button(modal, text="Write", command=write).pack(pady=10)
         ttk.Button(modal, text="Cancel", command=modal.destroy).pack(pady=5)
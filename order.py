@@ -0,0 +1,107 @@
+class Order:
+    """Compact order/task record shared by the API service and the UIs.
+
+    Uses ``__slots__`` so each record carries no per-instance dict, and
+    converts to and from the JSON/API dict shape with ``from_dict`` and
+    ``to_dict``.
+    """
+
+    __slots__ = (
+        "id",
+        "order_number",
+        "customer_name",
+        "title",
+        "url",
+        "tag_color",
+        "status",
+        "date",
+        "created_at",
+        "updated_at",
+        "version",
+    )
+
+    def __init__(
+        self,
+        id,
+        order_number="",
+        customer_name="",
+        title="",
+        url="",
+        tag_color="#FF5733",
+        status="Pending",
+        date="",
+        created_at="",
+        updated_at="",
+        version=0,
+    ):
+        self.id = id
+        self.order_number = order_number
+        self.customer_name = customer_name
+        self.title = title
+        self.url = url
+        self.tag_color = tag_color
+        self.status = status
+        self.date = date
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.version = version
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build an order from its API dict; missing fields get defaults."""
+        get = data.get
+        return cls(
+            data["id"],
+            get("order_number", ""),
+            get("customer_name", ""),
+            get("title", ""),
+            get("url", ""),
+            get("tag_color", "#FF5733"),
+            get("status", "Pending"),
+            get("date", ""),
+            get("created_at", ""),
+            get("updated_at", ""),
+            get("version", 0),
+        )
+
+    def to_dict(self):
+        """Return the order in its API dict shape."""
+        return {
+            "id": self.id,
+            "order_number": self.order_number,
+            "customer_name": self.customer_name,
+            "title": self.title,
+            "url": self.url,
+            "tag_color": self.tag_color,
+            "status": self.status,
+            "date": self.date,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "version": self.version,
+        }
+
+    def copy(self):
+        return Order(
+            self.id,
+            self.order_number,
+            self.customer_name,
+            self.title,
+            self.url,
+            self.tag_color,
+            self.status,
+            self.date,
+            self.created_at,
+            self.updated_at,
+            self.version,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Order):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    # Records are mutable and compared by value, so they can't be hashed
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Order(id={self.id!r}, order_number={self.order_number!r}, status={self.status!r})"
@@ -0,0 +1,164 @@
+import gzip
+import http.client
+import json
+import queue
+from urllib.parse import urlsplit
+
+from order import Order
+
+# Calls that can safely be sent twice; anything else (adding orders) isn't
+# retried once the request may have reached the server
+IDEMPOTENT_METHODS = (
+    "get_orders",
+    "get_orders_changed_since",
+    "get_summary",
+    "update_order_status",
+)
+
+
+class OrderServiceError(Exception):
+    """Raised when the order service rejects a call."""
+
+
+class OrderClient:
+    """Pooled keep-alive client for ``order_server``.
+
+    Exposes the same methods as ``APIService`` so ``NFCApp`` can use either,
+    plus ``batch`` to send several calls in one request.
+    """
+
+    def __init__(self, base_url, timeout=10, pool_size=4):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+
+    def get_connection(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def release(self, connection):
+        try:
+            self.pool.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def post(self, path, payload, idempotent=False):
+        """POST JSON and return the decoded JSON response.
+
+        A pooled connection may have been closed by the server, so a failed
+        request is retried once on a new connection: always if it failed
+        while being sent, and after that only when ``idempotent`` is set,
+        since the server may already have acted on it.
+        """
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept-Encoding": "gzip"}
+
+        for attempt in range(2):
+            connection = self.get_connection()
+            sent = False
+            try:
+                connection.request("POST", self.prefix + path, body, headers)
+                sent = True
+                response = connection.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                if attempt or (sent and not idempotent):
+                    raise
+                continue
+
+            if response.getheader("Connection", "").lower() == "close":
+                connection.close()
+            else:
+                self.release(connection)
+            break
+
+        try:
+            if response.getheader("Content-Encoding") == "gzip":
+                data = gzip.decompress(data)
+            result = json.loads(data)
+        except (ValueError, OSError, EOFError):
+            # e.g. an HTML error page from a proxy in front of the service
+            raise OrderServiceError(f"HTTP {response.status}: response is not JSON")
+        if response.status != 200:
+            error = result.get("error") if isinstance(result, dict) else None
+            raise OrderServiceError(error or f"HTTP {response.status}")
+        return result
+
+    def call(self, method, **params):
+        result = self.post(f"/api/{method}", params, idempotent=method in IDEMPOTENT_METHODS)
+        return decode_result(method, result["result"])
+
+    def batch(self, calls):
+        """Run ``(method, params)`` calls in one round trip.
+
+        Returns one result per call; a failed call gives an
+        ``OrderServiceError`` instance in its place.
+        """
+        payload = [{"method": method, "params": params} for method, params in calls]
+        idempotent = all(method in IDEMPOTENT_METHODS for method, _ in calls)
+        results = self.post("/api/batch", payload, idempotent=idempotent)["results"]
+        return [
+            decode_result(method, result["result"]) if "result" in result
+            else OrderServiceError(result["error"])
+            for (method, _), result in zip(calls, results)
+        ]
+
+    def get_orders(self, date=None, status=None, search_term=None):
+        return self.call("get_orders", date=date, status=status, search_term=search_term)
+
+    def iter_orders(self, date=None, status=None):
+        # The server answers with the whole list; yield it like APIService does
+        yield from self.get_orders(date=date, status=status)
+
+    def get_orders_changed_since(self, version=0, date=None):
+        return self.call("get_orders_changed_since", version=version, date=date)
+
+    def update_order_status(self, order_id, status, expected_version=None):
+        return self.call(
+            "update_order_status",
+            order_id=order_id,
+            status=status,
+            expected_version=expected_version,
+        )
+
+    def add_order(self, order_number, customer_name, product_name, url, tag_color="#FF5733", status="Pending"):
+        return self.call(
+            "add_order",
+            order_number=order_number,
+            customer_name=customer_name,
+            product_name=product_name,
+            url=url,
+            tag_color=tag_color,
+            status=status,
+        )
+
+    def add_orders(self, orders):
+        return self.call("add_orders", orders=orders)
+
+    def delete_order(self, order_id):
+        return self.call("delete_order", order_id=order_id)
+
+    def get_summary(self, date=None):
+        return self.call("get_summary", date=date)
+
+
+def decode_result(method, result):
+    """Turn order dicts in a method's result back into Orders."""
+    if method == "get_orders":
+        return [Order.from_dict(order) for order in result]
+    if method == "get_orders_changed_since":
+        result["upserts"] = [Order.from_dict(order) for order in result["upserts"]]
+    return result
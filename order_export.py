@@ -0,0 +1,119 @@
+import argparse
+import csv
+import json
+import os
+from datetime import datetime
+
+import api_service
+from order import Order
+from write_log import WriteLog
+
+EXPORT_FIELDS = Order.__slots__
+WRITTEN_STATUSES = ("Success", "Completed")
+PENDING_STATUSES = ("Pending", "In Progress")
+
+
+def export_orders(api, path, date=None, status=None):
+    """Stream matching orders to a CSV or JSONL file and return the row count.
+
+    The format follows the file extension (``.jsonl`` or CSV otherwise).
+    Rows are written as they come from ``APIService.iter_orders``, and the
+    file is swapped into place when complete.
+    """
+    tmp_path = path + ".tmp"
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for order in api.iter_orders(date=date, status=status):
+                f.write(json.dumps(order.to_dict()) + "\n")
+                count += 1
+        else:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_FIELDS)
+            for order in api.iter_orders(date=date, status=status):
+                writer.writerow([getattr(order, field) for field in EXPORT_FIELDS])
+                count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def station_throughput(entries):
+    """Per-station write counts and tags/minute from write log entries.
+
+    Throughput is successful writes over the span between a station's first
+    and last attempt, so idle time before and after a shift is not counted.
+    Tags that already held their URL are counted as skipped, not written.
+    """
+    stations = {}
+    for entry in entries:
+        stats = stations.setdefault(
+            entry["station"],
+            {"written": 0, "failed": 0, "skipped": 0, "first": entry["time"], "last": entry["time"]},
+        )
+        if entry.get("result") == "already written":
+            stats["skipped"] += 1
+        else:
+            stats["written" if entry["success"] else "failed"] += 1
+        stats["first"] = min(stats["first"], entry["time"])
+        stats["last"] = max(stats["last"], entry["time"])
+
+    for stats in stations.values():
+        span = (
+            datetime.strptime(stats["last"], "%Y-%m-%d %H:%M:%S")
+            - datetime.strptime(stats["first"], "%Y-%m-%d %H:%M:%S")
+        ).total_seconds()
+        stats["tags_per_minute"] = round(stats["written"] * 60 / span, 1) if span else None
+    return stations
+
+
+def end_of_day_report(api, date, write_log=None):
+    """Summarize a day: orders written vs pending and per-station throughput."""
+    summary = api.get_summary(date)
+    by_status = summary["by_status"]
+    write_log = write_log or WriteLog()
+    return {
+        "date": date,
+        "total": summary["total"],
+        "written": sum(by_status.get(status, 0) for status in WRITTEN_STATUSES),
+        "pending": sum(by_status.get(status, 0) for status in PENDING_STATUSES),
+        "by_status": by_status,
+        "stations": station_throughput(write_log.iter_entries(date)),
+    }
+
+
+def format_report(report):
+    """Render an end-of-day report as plain text lines."""
+    lines = [
+        f"End of day report for {report['date']}",
+        f"Orders: {report['total']}  written: {report['written']}  pending: {report['pending']}",
+    ]
+    for status, count in sorted(report["by_status"].items()):
+        lines.append(f"  {status}: {count}")
+    for station, stats in sorted(report["stations"].items()):
+        rate = stats["tags_per_minute"]
+        lines.append(
+            f"Station {station}: {stats['written']} written, {stats['failed']} failed, "
+            f"{stats['skipped']} already written, "
+            f"{rate if rate is not None else '-'} tags/min ({stats['first'][11:]}-{stats['last'][11:]})"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export orders and print the end-of-day report.")
+    parser.add_argument("path", nargs="?", help="CSV or JSONL file to export to")
+    parser.add_argument("--date", default=datetime.now().strftime("%Y-%m-%d"))
+    parser.add_argument("--status")
+    parser.add_argument("--sharded", action="store_true", help="use per-day shards")
+    args = parser.parse_args()
+
+    api = api_service.APIService(sharded=args.sharded, simulate_latency=False)
+    if args.path:
+        count = export_orders(api, args.path, date=args.date, status=args.status)
+        print(f"Exported {count} orders to {args.path}")
+    for line in format_report(end_of_day_report(api, args.date)):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import argparse
+import csv
+import json
+import os
+from itertools import islice
+
+import api_service
+import ndef
+
+REQUIRED_FIELDS = ("order_number", "url")
+STATUSES = ("Pending", "In Progress", "Completed", "Success")
+MAX_ERRORS = 100
+
+
+def iter_rows(path):
+    """Yield ``(line number, row dict)`` from a CSV or JSONL file, one at a time."""
+    if path.lower().endswith((".jsonl", ".ndjson")):
+        with open(path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield line_number, e
+                    continue
+                yield line_number, row if isinstance(row, dict) else ValueError("not an object")
+    else:
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def normalize_row(row):
+    """Validate an import row and return its ``add_orders`` fields.
+
+    Raises ``ValueError`` with a readable reason for rows that can't be imported.
+    """
+    if isinstance(row, Exception):
+        raise ValueError(f"invalid JSON: {row}")
+
+    row = {str(key).strip().lower(): str(value).strip() for key, value in row.items() if key and value is not None}
+    for field in REQUIRED_FIELDS:
+        if not row.get(field):
+            raise ValueError(f"missing {field}")
+
+    # Rejects URLs that can't go on a tag; the write path encodes its own image
+    url = ndef.normalize_url(row["url"])
+    ndef.encode_url(url)
+
+    status = row.get("status") or "Pending"
+    if status not in STATUSES:
+        raise ValueError(f"unknown status {status!r}")
+
+    fields = {
+        "order_number": row["order_number"],
+        "customer_name": row.get("customer_name", ""),
+        "product_name": row.get("product_name") or row.get("title", ""),
+        "url": url,
+        "tag_color": row.get("tag_color") or "#FF5733",
+        "status": status,
+    }
+    return fields
+
+
+class ImportResult:
+    """Counts from an import, with the first ``MAX_ERRORS`` rejected rows."""
+
+    def __init__(self):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []  # (line number, reason)
+
+    def reject(self, line_number, reason):
+        self.rejected += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((line_number, reason))
+
+
+def import_orders(api, path, batch_size=500, progress=None):
+    """Stream orders from a CSV or JSONL file into the API.
+
+    Rows are validated and their URLs normalized a batch at a time, and
+    each batch is committed with one ``add_orders`` call, so memory stays
+    bounded by ``batch_size`` however large the file is. ``progress`` is
+    called as ``progress(result)`` after each batch.
+    """
+    result = ImportResult()
+    rows = iter_rows(path)
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+
+        batch = []
+        for line_number, row in chunk:
+            try:
+                batch.append(normalize_row(row))
+            except ValueError as e:
+                result.reject(line_number, str(e))
+
+        if batch:
+            result.imported += len(api.add_orders(batch))
+
+        if progress:
+            progress(result)
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import orders from a CSV or JSONL file.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--sharded", action="store_true", help="use per-day shards")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.path):
+        parser.error(f"No such file: {args.path}")
+
+    api = api_service.APIService(sharded=args.sharded, simulate_latency=False)
+    result = import_orders(
+        api,
+        args.path,
+        batch_size=args.batch_size,
+        progress=lambda r: print(f"Imported {r.imported}, rejected {r.rejected}", end="\r"),
+    )
+    print(f"Imported {result.imported}, rejected {result.rejected}")
+    for line_number, reason in result.errors:
+        print(f"  line {line_number}: {reason}")
+
+
+if __name__ == "__main__":
+    main()
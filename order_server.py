@@ -0,0 +1,160 @@
+import argparse
+import gzip
+import inspect
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import api_service
+from order import Order
+
+# APIService methods that can be called over HTTP
+METHODS = (
+    "get_orders",
+    "get_orders_changed_since",
+    "update_order_status",
+    "add_order",
+    "add_orders",
+    "delete_order",
+    "get_summary",
+)
+GZIP_MIN_SIZE = 1024
+
+
+def to_json(value):
+    """Convert API results (Orders, lists, dicts) to JSON-ready values."""
+    if isinstance(value, Order):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_json(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    return value
+
+
+class OrderRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over a shared APIService.
+
+    ``POST /api/<method>`` calls one method with the JSON body as keyword
+    arguments and ``POST /api/batch`` runs a list of
+    ``{"method": ..., "params": ...}`` calls in one round trip. Connections
+    are kept alive and responses are gzipped when the client accepts it.
+    A bad body or bad parameters get a 400, and a method that fails gets a
+    500.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        path = urlsplit(self.path).path
+        if not path.startswith("/api/"):
+            self.send_json(404, {"error": f"Unknown path: {path}"})
+            return
+
+        try:
+            params = self.read_json()
+        except ValueError as e:
+            self.send_json(400, {"error": f"Invalid body: {e}"})
+            return
+
+        name = path[len("/api/"):]
+        if name == "batch":
+            if not isinstance(params, list):
+                self.send_json(400, {"error": "Batch body must be a list of calls"})
+                return
+            for index, call in enumerate(params):
+                if not isinstance(call, dict) or not isinstance(call.get("params") or {}, dict):
+                    self.send_json(
+                        400, {"error": f"Call {index} must be an object with a params object"}
+                    )
+                    return
+            results = [
+                self.call(call.get("method"), call.get("params") or {})[1] for call in params
+            ]
+            self.send_json(200, {"results": results})
+            return
+
+        if not isinstance(params or {}, dict):
+            self.send_json(400, {"error": "Body must be an object of parameters"})
+            return
+        status, result = self.call(name, params or {})
+        self.send_json(status, result)
+
+    def call(self, name, params):
+        """Run one method; returns the HTTP status and the response payload."""
+        if name not in METHODS:
+            return 400, {"error": f"Unknown method: {name}"}
+        method = getattr(self.server.api, name)
+        try:
+            # Checked up front, so a TypeError from inside the method isn't blamed on the caller
+            inspect.signature(method).bind(**params)
+        except TypeError as e:
+            return 400, {"error": f"Bad parameters for {name}: {e}"}
+        try:
+            return 200, {"result": to_json(method(**params))}
+        except Exception as e:
+            self.log_error("Error in %s: %r", name, e)
+            return 500, {"error": f"Error in {name}: {e}"}
+
+    def read_json(self):
+        """The request body as JSON; raises ``ValueError`` for a bad body."""
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+        if self.headers.get("Content-Encoding") == "gzip":
+            try:
+                body = gzip.decompress(body)
+            except (OSError, EOFError) as e:
+                raise ValueError(f"bad gzip data ({e})")
+        return json.loads(body) if body else None
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if len(body) >= GZIP_MIN_SIZE and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body, compresslevel=5)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class OrderServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one APIService between connections."""
+
+    daemon_threads = True
+
+    def __init__(self, address, api, verbose=False):
+        super().__init__(address, OrderRequestHandler)
+        self.api = api
+        self.verbose = verbose
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the order API over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--snapshot", action="store_true", help="use the binary snapshot")
+    parser.add_argument("--sharded", action="store_true", help="use per-day shards")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args()
+
+    api = api_service.APIService(
+        snapshot=args.snapshot, sharded=args.sharded, simulate_latency=False
+    )
+    server = OrderServer((args.host, args.port), api, verbose=args.verbose)
+    print(f"Order service listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import gzip
+import json
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from order import Order
+
+
+class OrderShards:
+    """Orders stored as one file per day.
+
+    Days inside the hot window are plain JSON files kept in memory. Older
+    days are gzipped into ``archive/`` and only read when a query asks for
+    them, through a small LRU cache. A manifest holds each day's count, id
+    range and highest version, so id lookups and delta queries only open the
+    days that can match.
+    """
+
+    def __init__(self, shard_dir, hot_days=7, cold_cache_size=4):
+        self.shard_dir = shard_dir
+        self.archive_dir = os.path.join(shard_dir, "archive")
+        self.manifest_file = os.path.join(shard_dir, "manifest.json")
+        self.hot_days = hot_days
+        self.cold_cache_size = cold_cache_size
+        self.manifest = {}  # date -> count, min_id, max_id, max_version, archived
+        self.hot = {}  # date -> list of Order
+        self.cold = OrderedDict()  # date -> list of Order, least recently used first
+        self.dirty = set()
+
+    def exists(self):
+        return os.path.exists(self.manifest_file)
+
+    def load(self):
+        """Read the manifest; days are read on first use."""
+        with open(self.manifest_file, "r") as f:
+            self.manifest = json.load(f)
+        self.hot = {}
+        self.cold = OrderedDict()
+        self.dirty = set()
+        # Archive the days that aged out since the last run
+        self.flush()
+
+    def import_orders(self, orders):
+        """Split a flat order list into day shards."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.manifest = {}
+        self.hot = {}
+        self.cold = OrderedDict()
+        for order in orders:
+            self.add(order)
+        self.flush()
+
+    def hot_cutoff(self):
+        return (datetime.now() - timedelta(days=self.hot_days)).strftime("%Y-%m-%d")
+
+    def shard_path(self, date):
+        if self.manifest.get(date, {}).get("archived"):
+            return os.path.join(self.archive_dir, f"{date}.json.gz")
+        return os.path.join(self.shard_dir, f"{date}.json")
+
+    def read_shard(self, date):
+        path = self.shard_path(date)
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            return [Order.from_dict(order) for order in json.load(f)]
+
+    def write_shard(self, date, orders):
+        path = self.shard_path(date)
+        opener = gzip.open if path.endswith(".gz") else open
+        tmp_path = path + ".tmp"
+        with opener(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump([order.to_dict() for order in orders], f)
+        os.replace(tmp_path, path)
+
+    def day(self, date):
+        """Return the order list for a date, loading it if needed."""
+        if date in self.hot:
+            return self.hot[date]
+        if date in self.cold:
+            self.cold.move_to_end(date)
+            return self.cold[date]
+
+        if date not in self.manifest:
+            orders = []
+        else:
+            orders = self.read_shard(date)
+
+        if not self.manifest.get(date, {}).get("archived"):
+            self.hot[date] = orders
+            return orders
+
+        self.cold[date] = orders
+        while len(self.cold) > self.cold_cache_size:
+            old_date, old_orders = self.cold.popitem(last=False)
+            if old_date in self.dirty:
+                self.write_shard(old_date, old_orders)
+                self.dirty.discard(old_date)
+        return orders
+
+    def dates(self):
+        return sorted(self.manifest)
+
+    def iter_orders(self, dates=None):
+        for date in self.dates() if dates is None else dates:
+            yield from self.day(date)
+
+    def orders_for(self, date=None):
+        """Orders for one date, or for every day when no date is given."""
+        if date:
+            return self.day(date) if date in self.manifest else []
+        return self.iter_orders()
+
+    def find(self, order_id):
+        """Return the order with an id, opening only the days whose range holds it."""
+        for date, info in self.manifest.items():
+            if info["min_id"] <= order_id <= info["max_id"]:
+                for order in self.day(date):
+                    if order.id == order_id:
+                        return order
+        return None
+
+    def max_id(self):
+        return max((info["max_id"] for info in self.manifest.values()), default=0)
+
+    def max_version(self):
+        return max((info["max_version"] for info in self.manifest.values()), default=0)
+
+    def changed_since(self, version, date=None):
+        """Orders newer than a version, skipping days with nothing newer."""
+        changed = []
+        for day, info in sorted(self.manifest.items()):
+            if date and day != date:
+                continue
+            if info["max_version"] > version:
+                changed.extend(order for order in self.day(day) if order.version > version)
+        return changed
+
+    def add(self, order):
+        orders = self.day(order.date)
+        orders.append(order)
+        info = self.manifest.setdefault(
+            order.date,
+            {"count": 0, "min_id": order.id, "max_id": order.id, "max_version": 0, "archived": False},
+        )
+        info["count"] += 1
+        info["min_id"] = min(info["min_id"], order.id)
+        info["max_id"] = max(info["max_id"], order.id)
+        info["max_version"] = max(info["max_version"], order.version)
+        self.dirty.add(order.date)
+
+    def touch(self, order):
+        """Record that an order was changed in place."""
+        info = self.manifest[order.date]
+        info["max_version"] = max(info["max_version"], order.version)
+        self.dirty.add(order.date)
+
+    def remove(self, order_id):
+        order = self.find(order_id)
+        if order is None:
+            return None
+        orders = self.day(order.date)
+        del orders[next(i for i, other in enumerate(orders) if other is order)]
+        self.manifest[order.date]["count"] -= 1
+        self.dirty.add(order.date)
+        return order
+
+    def archive_old_days(self):
+        """Move days that left the hot window to compressed archive files."""
+        cutoff = self.hot_cutoff()
+        for date, info in self.manifest.items():
+            if info["archived"] or date >= cutoff:
+                continue
+            orders = self.day(date)
+            hot_path = self.shard_path(date)
+            info["archived"] = True
+            self.write_shard(date, orders)
+            if os.path.exists(hot_path):
+                os.remove(hot_path)
+            self.hot.pop(date, None)
+            self.dirty.discard(date)
+
+    def flush(self):
+        """Write the changed days and the manifest."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        self.archive_old_days()
+        for date in sorted(self.dirty):
+            self.write_shard(date, self.day(date))
+        self.dirty.clear()
+
+        tmp_path = self.manifest_file + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_file)
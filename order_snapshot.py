@@ -0,0 +1,335 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import MutableSequence
+from itertools import chain
+
+from order import Order
+
+# File layout:
+#   header:  magic, record count, offset of the index, highest id and version
+#   records: uint32 payload length + payload, one per order
+#   index:   one column each of ids, versions and record offsets (int64)
+#            and dates (10 bytes), so scans run over packed arrays
+# A payload is the id and version followed by the string fields, each as
+# a uint32 length and UTF-8 bytes.
+MAGIC = b"TAPSNAP2"
+HEADER = struct.Struct("<8sIQqq")
+DATE_SIZE = 10
+LENGTH = struct.Struct("<I")
+RECORD_HEAD = struct.Struct("<qq")
+STRING_FIELDS = (
+    "order_number",
+    "customer_name",
+    "title",
+    "url",
+    "tag_color",
+    "status",
+    "date",
+    "created_at",
+    "updated_at",
+)
+
+
+def encode_order(order):
+    """Encode an order as a length-prefixed record."""
+    parts = [RECORD_HEAD.pack(order.id, order.version)]
+    for field in STRING_FIELDS:
+        value = getattr(order, field).encode("utf-8")
+        parts.append(LENGTH.pack(len(value)))
+        parts.append(value)
+    payload = b"".join(parts)
+    return LENGTH.pack(len(payload)) + payload
+
+
+def decode_order(buffer, offset):
+    """Decode the record starting at offset (at its length prefix)."""
+    pos = offset + LENGTH.size
+    order_id, version = RECORD_HEAD.unpack_from(buffer, pos)
+    pos += RECORD_HEAD.size
+    values = []
+    for _ in STRING_FIELDS:
+        (length,) = LENGTH.unpack_from(buffer, pos)
+        pos += LENGTH.size
+        values.append(bytes(buffer[pos : pos + length]).decode("utf-8"))
+        pos += length
+    return Order(order_id, *values, version=version)
+
+
+def write_snapshot(path, entries):
+    """Write a snapshot file atomically.
+
+    Each entry is an ``Order`` or a ``(raw record bytes, date)`` pair, so
+    unchanged records can be copied without decoding them.
+    """
+    tmp_path = path + ".tmp"
+    ids, versions, offsets = array("q"), array("q"), array("q")
+    dates = bytearray()
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, 0, 0, 0, 0))
+        offset = HEADER.size
+        for entry in entries:
+            if isinstance(entry, Order):
+                record = encode_order(entry)
+                order_id, version, date = entry.id, entry.version, entry.date
+            else:
+                record, date = entry
+                order_id, version = RECORD_HEAD.unpack_from(record, LENGTH.size)
+            f.write(record)
+            ids.append(order_id)
+            versions.append(version)
+            offsets.append(offset)
+            dates += date.encode("ascii", "replace")[:DATE_SIZE].ljust(DATE_SIZE, b"\0")
+            offset += len(record)
+
+        for column in (ids, versions, offsets):
+            if sys.byteorder == "big":
+                column.byteswap()
+            f.write(column.tobytes())
+        f.write(dates)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, len(ids), offset, max(ids, default=0), max(versions, default=0)))
+    os.replace(tmp_path, path)
+
+
+def int_column(buffer, start, count):
+    """Copy ``count`` little-endian int64s out of a buffer into an array."""
+    column = array("q")
+    column.frombytes(buffer[start : start + count * column.itemsize])
+    if sys.byteorder == "big":
+        column.byteswap()
+    return column
+
+
+class OrderSnapshot:
+    """Read-only, memory-mapped view of a snapshot file.
+
+    The index columns are copied out of the map once, as packed arrays, so
+    lookups and scans over them run in C rather than unpacking entries.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count, index_offset, self.max_id, self.max_version = HEADER.unpack_from(self.map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not an order snapshot: {path}")
+            column_size = self.count * 8
+            self.ids = int_column(self.map, index_offset, self.count)
+            self.versions = int_column(self.map, index_offset + column_size, self.count)
+            self.offsets = int_column(self.map, index_offset + 2 * column_size, self.count)
+            dates_offset = index_offset + 3 * column_size
+            self.dates = self.map[dates_offset : dates_offset + self.count * DATE_SIZE]
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if getattr(self, "map", None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def date(self, record):
+        start = record * DATE_SIZE
+        return self.dates[start : start + DATE_SIZE].rstrip(b"\0").decode("ascii")
+
+    def records_on(self, date):
+        """Record numbers whose date is ``date``, in order."""
+        key = date.encode("ascii", "replace")[:DATE_SIZE].ljust(DATE_SIZE, b"\0")
+        records = []
+        pos = self.dates.find(key)
+        while pos != -1:
+            if pos % DATE_SIZE == 0:
+                records.append(pos // DATE_SIZE)
+                pos = self.dates.find(key, pos + DATE_SIZE)
+            else:
+                pos = self.dates.find(key, pos + 1)
+        return records
+
+    def record_of_id(self, order_id):
+        """Record number holding an order id, or None."""
+        try:
+            return self.ids.index(order_id)
+        except ValueError:
+            return None
+
+    def raw(self, record):
+        offset = self.offsets[record]
+        (length,) = LENGTH.unpack_from(self.map, offset)
+        return self.map[offset : offset + LENGTH.size + length]
+
+    def order(self, record):
+        return decode_order(self.map, self.offsets[record])
+
+
+class LazyOrderList(MutableSequence):
+    """List of orders backed by a snapshot, decoding records on first access.
+
+    The list is the snapshot records still present (``records``, record
+    numbers in file order), followed by the orders ``added`` since. A
+    record is decoded into ``decoded`` the first time it is read or
+    replaced. ``select`` and ``index_of_id`` work from the snapshot's
+    index columns and only look at decoded and added orders one by one;
+    ``max_id`` and ``max_version`` come from the header, raised by every
+    order stored since.
+    """
+
+    def __init__(self, snapshot):
+        self.attach(snapshot, {})
+        self.added = []
+
+    def attach(self, snapshot, decoded):
+        self.snapshot = snapshot
+        self.records = array("q", range(snapshot.count))
+        self.present = bytearray(b"\1") * snapshot.count
+        self.decoded = decoded
+        self.top_id = snapshot.max_id
+        self.top_version = snapshot.max_version
+
+    def __len__(self):
+        return len(self.records) + len(self.added)
+
+    def positions(self, position):
+        if isinstance(position, slice):
+            return range(*position.indices(len(self)))
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("list index out of range")
+        return position
+
+    def __getitem__(self, position):
+        position = self.positions(position)
+        if isinstance(position, range):
+            return [self[i] for i in position]
+        if position >= len(self.records):
+            return self.added[position - len(self.records)]
+        record = self.records[position]
+        order = self.decoded.get(record)
+        if order is None:
+            order = self.decoded[record] = self.snapshot.order(record)
+        return order
+
+    def __setitem__(self, position, order):
+        position = self.positions(position)
+        if position >= len(self.records):
+            self.added[position - len(self.records)] = order
+        else:
+            self.decoded[self.records[position]] = order
+        self.raise_tops(order)
+
+    def __delitem__(self, position):
+        position = self.positions(position)
+        if isinstance(position, range):
+            for i in sorted(position, reverse=True):
+                del self[i]
+            return
+        if position >= len(self.records):
+            del self.added[position - len(self.records)]
+            return
+        record = self.records.pop(position)
+        self.present[record] = 0
+        self.decoded.pop(record, None)
+
+    def insert(self, position, order):
+        if position < 0:
+            position = max(0, position + len(self))
+        if position < len(self.records):
+            # Snapshot records keep file order; move the ones after it to the added orders
+            self.added[:0] = [self[i] for i in range(position, len(self.records))]
+            for record in self.records[position:]:
+                self.present[record] = 0
+                self.decoded.pop(record, None)
+            del self.records[position:]
+        self.added.insert(position - len(self.records), order)
+        self.raise_tops(order)
+
+    def raise_tops(self, order):
+        self.top_id = max(self.top_id, order.id)
+        self.top_version = max(self.top_version, order.version)
+
+    def select(self, date=None, min_version=None):
+        """Return the orders for a date and/or newer than a version."""
+        snapshot = self.snapshot
+        if date:
+            candidates = snapshot.records_on(date)
+        else:
+            candidates = range(snapshot.count)
+        if min_version is not None:
+            versions = snapshot.versions
+            candidates = [record for record in candidates if versions[record] > min_version]
+
+        def wanted(order):
+            if date and order.date != date:
+                return False
+            return min_version is None or order.version > min_version
+
+        # Decoded orders may have moved to another date or version since the file was written
+        present, decoded = self.present, self.decoded
+        selected = {
+            record: decoded.get(record) or snapshot.order(record)
+            for record in candidates
+            if present[record] and (record not in decoded or wanted(decoded[record]))
+        }
+        for record, order in decoded.items():
+            if record not in selected and wanted(order):
+                selected[record] = order
+        return [selected[record] for record in sorted(selected)] + [
+            order for order in self.added if wanted(order)
+        ]
+
+    def index_of_id(self, order_id):
+        record = self.snapshot.record_of_id(order_id)
+        if record is not None and self.present[record]:
+            return bisect_left(self.records, record)
+        for position, order in enumerate(self.added):
+            if order.id == order_id:
+                return len(self.records) + position
+        return None
+
+    def max_id(self):
+        """Highest id stored since the snapshot was written, deleted or not."""
+        return self.top_id
+
+    def max_version(self):
+        return self.top_version
+
+    def iter_orders(self, start=0):
+        """Yield every order from ``start`` on without keeping the decoded copies."""
+        records = self.records
+        for position in range(start, len(records)):
+            order = self.decoded.get(records[position])
+            yield order if order is not None else self.snapshot.order(records[position])
+        yield from self.added[max(0, start - len(records)):]
+
+    def save(self, path=None):
+        """Rewrite the snapshot with the current items and remap onto it."""
+        path = path or self.snapshot.path
+        entries = (
+            self.decoded[record] if record in self.decoded
+            else (self.snapshot.raw(record), self.snapshot.date(record))
+            for record in self.records
+        )
+        # Write beside the old file first; it stays mapped until the swap
+        write_snapshot(path + ".new", chain(entries, self.added))
+        # Orders already handed out stay the live copies after the swap
+        decoded = {
+            position: self.decoded[record]
+            for position, record in enumerate(self.records)
+            if record in self.decoded
+        }
+        first_added = len(self.records)
+        decoded.update((first_added + i, order) for i, order in enumerate(self.added))
+        top_id, top_version = self.top_id, self.top_version
+        self.snapshot.close()
+        os.replace(path + ".new", path)
+        self.attach(OrderSnapshot(path), decoded)
+        self.added = []
+        self.top_id = max(self.top_id, top_id)
+        self.top_version = max(self.top_version, top_version)
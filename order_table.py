@@ -0,0 +1,266 @@
+import numpy as np
+
+from order import Order
+
+
+class GrowableArray:
+    """NumPy array with amortized O(1) appends."""
+
+    def __init__(self, dtype, capacity=1024):
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, len(self.data) * 2)
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self):
+        """Return the filled part of the array (no copy)."""
+        return self.data[: self.size]
+
+    def __getitem__(self, index):
+        return self.data[: self.size][index]
+
+    def __setitem__(self, index, value):
+        self.data[: self.size][index] = value
+
+
+class CategoryColumn:
+    """Interned column storing small integer codes for repeated strings."""
+
+    def __init__(self):
+        self.codes = GrowableArray(np.int32)
+        self.values = []
+        self.index = {}
+
+    def code_for(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.index[value] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self.code_for(value))
+
+    def set(self, row, value):
+        self.codes[row] = self.code_for(value)
+
+    def get(self, row):
+        return self.values[self.codes[row]]
+
+    def mask_equal(self, value):
+        """Boolean mask of the rows holding value."""
+        code = self.index.get(value)
+        if code is None:
+            return np.zeros(self.codes.size, dtype=bool)
+        return self.codes.view() == code
+
+    def sort_ranks(self):
+        """Rank of each row's value in string order, for sorting."""
+        order = sorted(range(len(self.values)), key=self.values.__getitem__)
+        ranks = np.empty(len(self.values), dtype=np.int32)
+        ranks[order] = np.arange(len(self.values), dtype=np.int32)
+        return ranks[self.codes.view()]
+
+
+class StringColumn:
+    """UTF-8 string arena with per-row start/end offsets.
+
+    Updates append the new value and repoint the row, so the arena only
+    grows. When ``searchable`` is set a lowercased copy is kept for
+    substring search, in its own arena with its own offsets, since
+    lowercasing can change a value's length in bytes.
+    """
+
+    def __init__(self, searchable=False):
+        self.arena = bytearray()
+        self.starts = GrowableArray(np.int64)
+        self.ends = GrowableArray(np.int64)
+        self.searchable = searchable
+        if searchable:
+            self.lower_arena = bytearray()
+            self.lower_starts = GrowableArray(np.int64)
+            self.lower_ends = GrowableArray(np.int64)
+
+    def append(self, value):
+        self.starts.append(len(self.arena))
+        self.arena += value.encode("utf-8")
+        self.ends.append(len(self.arena))
+        if self.searchable:
+            self.lower_starts.append(len(self.lower_arena))
+            self.lower_arena += value.lower().encode("utf-8")
+            self.lower_ends.append(len(self.lower_arena))
+
+    def set(self, row, value):
+        self.starts[row] = len(self.arena)
+        self.arena += value.encode("utf-8")
+        self.ends[row] = len(self.arena)
+        if self.searchable:
+            self.lower_starts[row] = len(self.lower_arena)
+            self.lower_arena += value.lower().encode("utf-8")
+            self.lower_ends[row] = len(self.lower_arena)
+
+    def get(self, row):
+        return self.arena[self.starts[row] : self.ends[row]].decode("utf-8")
+
+    def mask_contains(self, term):
+        """Boolean mask of the rows whose lowercased value contains term."""
+        rows = self.starts.size
+        needle = np.frombuffer(term.lower().encode("utf-8"), dtype=np.uint8)
+        haystack = np.frombuffer(self.lower_arena, dtype=np.uint8)
+        mask = np.zeros(rows, dtype=bool)
+        if len(needle) == 0:
+            return ~mask
+        if len(needle) > len(haystack):
+            return mask
+
+        # Compare the needle against every arena offset, one byte at a time
+        span = len(haystack) - len(needle) + 1
+        hits = haystack[:span] == needle[0]
+        for i in range(1, len(needle)):
+            hits &= haystack[i : i + span] == needle[i]
+        positions = np.flatnonzero(hits)
+        if len(positions) == 0:
+            return mask
+
+        # Map each match to the row whose span contains it
+        starts = self.lower_starts.view()
+        ends = self.lower_ends.view()
+        order = np.argsort(starts, kind="stable")
+        slot = np.searchsorted(starts[order], positions, side="right") - 1
+        valid = slot >= 0
+        matched_rows = order[slot[valid]]
+        inside = positions[valid] + len(needle) <= ends[matched_rows]
+        mask[matched_rows[inside]] = True
+        return mask
+
+
+class OrderTable:
+    """Columnar store for orders.
+
+    Status, date and tag colour are interned to integer codes, ids and
+    versions are integer arrays and the free-text fields live in string
+    arenas. Filters are computed as boolean masks and ``Order`` records are
+    only built for the rows that are returned.
+    """
+
+    CATEGORY_FIELDS = ("status", "date", "tag_color")
+    STRING_FIELDS = ("order_number", "customer_name", "title", "url", "created_at", "updated_at")
+    SEARCH_FIELDS = ("order_number", "customer_name", "title")
+
+    def __init__(self):
+        self.ids = GrowableArray(np.int64)
+        self.versions = GrowableArray(np.int64)
+        self.alive = GrowableArray(np.bool_)
+        self.columns = {}
+        for field in self.CATEGORY_FIELDS:
+            self.columns[field] = CategoryColumn()
+        for field in self.STRING_FIELDS:
+            self.columns[field] = StringColumn(searchable=field in self.SEARCH_FIELDS)
+
+    @classmethod
+    def from_records(cls, records):
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive.view()))
+
+    def append(self, order):
+        """Add an ``Order`` as a new row."""
+        self.ids.append(order.id)
+        self.versions.append(order.version)
+        self.alive.append(True)
+        for field, column in self.columns.items():
+            column.append(getattr(order, field))
+
+    def find_row(self, order_id):
+        """Return the row index of a live order, or None."""
+        rows = np.flatnonzero((self.ids.view() == order_id) & self.alive.view())
+        return int(rows[0]) if len(rows) else None
+
+    def set_fields(self, row, **fields):
+        """Update fields of a row in place."""
+        for field, value in fields.items():
+            if field == "version":
+                self.versions[row] = value
+            else:
+                self.columns[field].set(row, value)
+
+    def delete(self, row):
+        self.alive[row] = False
+
+    def max_id(self):
+        ids = self.ids.view()[self.alive.view()]
+        return int(ids.max()) if len(ids) else 0
+
+    def max_version(self):
+        return int(self.versions.view().max()) if self.versions.size else 0
+
+    def record(self, row):
+        """Materialize a row as an ``Order``."""
+        columns = self.columns
+        return Order(
+            int(self.ids[row]),
+            columns["order_number"].get(row),
+            columns["customer_name"].get(row),
+            columns["title"].get(row),
+            columns["url"].get(row),
+            columns["tag_color"].get(row),
+            columns["status"].get(row),
+            columns["date"].get(row),
+            columns["created_at"].get(row),
+            columns["updated_at"].get(row),
+            int(self.versions[row]),
+        )
+
+    def iter_records(self):
+        """Yield every live order, in insertion order."""
+        for row in np.flatnonzero(self.alive.view()):
+            yield self.record(row)
+
+    def query(self, date=None, status=None, search_term=None):
+        """Same filtering and ordering as ``api_service.filter_orders``."""
+        mask = self.alive.view().copy()
+
+        if date:
+            mask &= self.columns["date"].mask_equal(date)
+
+        if status:
+            mask &= self.columns["status"].mask_equal(status)
+
+        if search_term:
+            matches = np.zeros(len(mask), dtype=bool)
+            for field in self.SEARCH_FIELDS:
+                matches |= self.columns[field].mask_contains(search_term)
+            mask &= matches
+
+        rows = np.flatnonzero(mask)
+
+        # Sort by date and ID, newest first
+        date_ranks = self.columns["date"].sort_ranks()[rows]
+        rows = rows[np.lexsort((self.ids.view()[rows], date_ranks))[::-1]]
+
+        return [self.record(row) for row in rows]
+
+    def rows(self, date=None, status=None, start=0):
+        """Live rows from ``start`` on matching a date and status, in row order."""
+        mask = self.alive.view()[start:].copy()
+        if date:
+            mask &= self.columns["date"].mask_equal(date)[start:]
+        if status:
+            mask &= self.columns["status"].mask_equal(status)[start:]
+        return np.flatnonzero(mask) + start
+
+    def changed_since(self, version, date=None):
+        """Orders whose version is newer than the given one, optionally on one date."""
+        mask = self.alive.view() & (self.versions.view() > version)
+        if date:
+            mask &= self.columns["date"].mask_equal(date)
+        return [self.record(row) for row in np.flatnonzero(mask)]
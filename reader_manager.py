@@ -0,0 +1,146 @@
+import queue
+import threading
+import time
+
+from smartcard.System import readers
+
+from nfc_service import NFCReader
+
+
+class ReaderManager:
+    """One ``NFCReader`` connection and worker per attached PC/SC reader.
+
+    ``connect`` opens every attached reader, using ``primary`` for the
+    reader it owns, and keeps the heads it opens by reader name, so later
+    calls reuse the connections that are still open instead of opening new
+    ones. Heads whose reader was unplugged are disconnected.
+
+    ``start`` runs a polling thread per head that puts ``(reader name, uid,
+    url)`` on the shared ``events`` queue whenever a tag appears, with
+    ``uid`` None when it is removed; the URL comes from ``bindings`` when
+    the tag was written here, otherwise from the tag. Write jobs go through
+    ``BatchWriter``, which takes ``heads`` as its readers and shares one
+    order queue between them; stop the workers first.
+    """
+
+    def __init__(self, log_callback, primary=None, bindings=None, poll_interval=0.2):
+        self.log_callback = log_callback
+        self.primary = primary
+        self.bindings = bindings
+        self.poll_interval = poll_interval
+        self.by_name = {}  # reader name -> NFCReader opened here
+        self.heads = []
+        self.head_names = []  # reader name of each head
+        self.events = queue.Queue()
+        # Set to stop the workers of the last start
+        self.stopping = threading.Event()
+        self.threads = []
+
+    def connect(self):
+        """Open a connection to every attached reader and return them."""
+        try:
+            attached = readers()
+        except Exception as e:
+            self.log_callback(f"Error listing readers: {e}")
+            return []
+
+        names = {str(reader) for reader in attached}
+        for name in list(self.by_name):
+            if name not in names:
+                self.by_name.pop(name).disconnect()
+
+        primary_name = self.primary_name(attached)
+        self.heads = []
+        self.head_names = []
+        for reader in attached:
+            name = str(reader)
+            if name == primary_name:
+                # The primary's supervisor owns this reader; don't hold a second connection
+                stale = self.by_name.pop(name, None)
+                if stale is not None:
+                    stale.disconnect()
+                head = self.primary
+            else:
+                head = self.by_name.get(name)
+                if head is None or not head.connection:
+                    head = NFCReader(self.reader_log(name), reader=reader)
+                    if not head.connect():
+                        continue
+                    self.by_name[name] = head
+            self.heads.append(head)
+            self.head_names.append(name)
+        return self.heads
+
+    def primary_name(self, attached):
+        """Name of the reader ``primary`` uses, even while it is reconnecting."""
+        if self.primary is None:
+            return None
+        if self.primary.reader is not None:
+            return str(self.primary.reader)
+        if self.primary.supervisor is not None and attached:
+            # It will pick the first reader once its supervisor reconnects
+            return str(attached[0])
+        return None
+
+    def reader_log(self, name):
+        return lambda message: self.log_callback(f"[{name}] {message}")
+
+    def start(self):
+        """Start polling every reader for tags."""
+        self.stopping.set()
+        self.connect()
+        self.stopping = stopping = threading.Event()
+        workers = [
+            threading.Thread(target=self.poll, args=(head, name, stopping), daemon=True)
+            for head, name in zip(self.heads, self.head_names)
+        ]
+        # Workers of an earlier start may still be finishing a read
+        self.threads = [thread for thread in self.threads if thread.is_alive()] + workers
+        for thread in workers:
+            thread.start()
+
+    def stop(self, wait=False):
+        """Stop the workers; with ``wait``, until each has finished its current read."""
+        self.stopping.set()
+        if wait:
+            for thread in self.threads:
+                thread.join()
+            self.threads = []
+
+    def poll(self, head, name, stopping):
+        last_uid = None
+        while not stopping.is_set():
+            if not head.connection:
+                # The primary's supervisor reconnects it; heads opened here reconnect in the background
+                if head.supervisor is None:
+                    head.reconnect_later()
+                uid = None
+            else:
+                try:
+                    uid = head.read_uid()
+                except Exception:
+                    uid = None
+
+            if uid != last_uid:
+                last_uid = uid
+                url = None
+                if uid:
+                    binding = self.bindings.lookup(uid) if self.bindings is not None else None
+                    if binding:
+                        url = binding["url"]
+                    else:
+                        try:
+                            url = head.read_ntag_url()
+                        except Exception as e:
+                            head.log_callback(f"Error reading URL: {e}")
+                self.events.put((name, uid, url))
+            time.sleep(self.poll_interval)
+
+    def disconnect(self):
+        """Close every connection opened here; the primary is left alone."""
+        self.stop(wait=True)
+        for head in self.by_name.values():
+            head.disconnect()
+        self.by_name = {}
+        self.heads = []
+        self.head_names = []
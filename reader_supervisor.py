@@ -0,0 +1,124 @@
+import random
+import threading
+
+from smartcard.ReaderMonitoring import ReaderMonitor, ReaderObserver
+
+# Health states reported to on_health
+CONNECTED = "connected"
+RECONNECTING = "reconnecting"
+NO_READER = "no reader"
+
+
+class ReaderSupervisor(ReaderObserver):
+    """Keeps an ``NFCReader`` connected across USB glitches and hot-plug.
+
+    pyscard's ``ReaderMonitor`` keeps its own PC/SC context and tells us
+    when readers are attached or removed, so the list of readers is never
+    re-enumerated on an error. Failures reported by the reader wake a
+    single reconnect thread, which retries with exponential backoff and
+    jitter (``initial_backoff`` doubling up to ``max_backoff`` seconds).
+    When the reader is unplugged the thread waits for it to come back
+    instead of retrying. A lost connection is disconnected off-thread,
+    and reconnecting reopens it on the same PC/SC context rather than
+    creating a new one. ``on_health(state)`` is called from the
+    supervisor's threads when the state changes.
+    """
+
+    def __init__(self, nfc_reader, log_callback, on_health=None, initial_backoff=0.5, max_backoff=30.0):
+        super().__init__()
+        self.nfc_reader = nfc_reader
+        self.log_callback = log_callback
+        self.on_health = on_health
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.health = RECONNECTING
+        self.attached = {}  # reader name -> pyscard reader, as reported by the monitor
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.monitor = None
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.nfc_reader.supervisor = self
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        # Reports the readers already attached straight away, then every change
+        self.monitor = ReaderMonitor()
+        self.monitor.addObserver(self)
+        self.wakeup.set()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        if self.monitor is not None:
+            self.monitor.deleteObserver(self)
+        self.nfc_reader.supervisor = None
+
+    def set_health(self, health):
+        if health == self.health:
+            return
+        self.health = health
+        self.log_callback(f"Reader {health}")
+        if self.on_health:
+            self.on_health(health)
+
+    def update(self, observable, actions):
+        """ReaderObserver callback with the (added, removed) reader lists."""
+        added, removed = actions
+        with self.lock:
+            for reader in added:
+                self.attached[str(reader)] = reader
+            for reader in removed:
+                self.attached.pop(str(reader), None)
+
+        current = str(self.nfc_reader.reader) if self.nfc_reader.reader is not None else None
+        if current is not None and current in {str(reader) for reader in removed}:
+            self.nfc_reader.release(self.nfc_reader.connection)
+            self.set_health(NO_READER)
+        if added and self.health != CONNECTED:
+            self.wakeup.set()
+
+    def report_failure(self, error):
+        """Called by the reader when its connection fails; never blocks.
+
+        Only the first failure of an outage wakes the reconnect thread, so
+        callers that keep polling don't cut the backoff short.
+        """
+        if self.health == CONNECTED:
+            self.log_callback(f"Reader connection lost: {error}")
+            self.set_health(RECONNECTING)
+            self.wakeup.set()
+
+    def pick_reader(self):
+        """The reader to connect to: the pinned one if attached, else any."""
+        with self.lock:
+            pinned = self.nfc_reader.pinned_reader
+            if pinned is not None:
+                return self.attached.get(str(pinned))
+            return next(iter(self.attached.values()), None)
+
+    def run(self):
+        while self.running:
+            self.wakeup.wait()
+            self.wakeup.clear()
+
+            attempt = 0
+            while self.running and self.health != CONNECTED:
+                reader = self.pick_reader()
+                if reader is None:
+                    # Nothing to connect to; the monitor wakes us when one is plugged in
+                    self.set_health(NO_READER)
+                    break
+
+                if self.nfc_reader.connect(reader):
+                    self.set_health(CONNECTED)
+                    break
+
+                self.set_health(RECONNECTING)
+                delay = min(self.max_backoff, self.initial_backoff * 2 ** attempt)
+                attempt += 1
+                # Full jitter, so several stations don't retry in lockstep
+                if self.wakeup.wait(random.uniform(0, delay)):
+                    self.wakeup.clear()
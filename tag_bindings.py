@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+BINDINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tag_bindings.jsonl")
+# Rewrite the file once it holds this many times more lines than live bindings
+COMPACT_RATIO = 4
+COMPACT_MIN_LINES = 1000
+
+
+class TagBindings:
+    """Which order each tag UID was written for.
+
+    Every bind is appended to a JSONL file as ``{"uid", "order_id", "url",
+    "time"}``; the latest line for a UID wins, and one with ``order_id``
+    null unbinds it. The file is read once into a dict, so ``lookup`` is a
+    hash lookup that never touches the disk. When rebinding leaves the file
+    mostly stale lines it is rewritten with one line per UID, atomically.
+    """
+
+    def __init__(self, path=BINDINGS_FILE):
+        self.path = path
+        self.index = None  # uid -> binding dict
+        self.lines = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        self.index = {}
+        self.lines = 0
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    binding = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if binding.get("order_id") is None:
+                    self.index.pop(binding["uid"], None)
+                else:
+                    self.index[binding["uid"]] = binding
+                self.lines += 1
+
+    def lookup(self, uid):
+        """The binding for a UID, or None if it was never written here."""
+        with self.lock:
+            if self.index is None:
+                self.load()
+            return self.index.get(uid)
+
+    def bind(self, uid, order_id, url):
+        """Record that the tag ``uid`` now holds ``order_id``'s URL."""
+        binding = {
+            "uid": uid,
+            "order_id": order_id,
+            "url": url,
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        line = json.dumps(binding) + "\n"
+        with self.lock:
+            if self.index is None:
+                self.load()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.index[uid] = binding
+            self.lines += 1
+            self.maybe_compact()
+        return binding
+
+    def unbind(self, uid):
+        """Forget the tag ``uid``'s order, e.g. after it was formatted."""
+        with self.lock:
+            if self.index is None:
+                self.load()
+            if uid not in self.index:
+                return
+            tombstone = {
+                "uid": uid,
+                "order_id": None,
+                "url": None,
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(tombstone) + "\n")
+            del self.index[uid]
+            self.lines += 1
+            self.maybe_compact()
+
+    def maybe_compact(self):
+        if self.lines >= COMPACT_MIN_LINES and self.lines > COMPACT_RATIO * len(self.index):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the file with only the current binding for each UID."""
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for binding in self.index.values():
+                    f.write(json.dumps(binding) + "\n")
+            os.replace(tmp_path, self.path)
+            self.lines = len(self.index)
+        except OSError as e:
+            print(f"Error compacting tag bindings: {e}")
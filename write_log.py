@@ -0,0 +1,289 @@
+import glob
+import hashlib
+import json
+import math
+import os
+import queue
+import re
+import socket
+import threading
+import zlib
+from datetime import datetime
+
+WRITE_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "write_log.jsonl")
+# The current file is renamed aside with the next sequence number once it reaches this size
+MAX_LOG_BYTES = 32 * 1024 * 1024
+# Issued UIDs, hashed into this many append-only bucket files
+UID_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "write_log_uids")
+UID_BUCKETS = 256
+# Bloom filter sizing; past capacity the false positive rate climbs, nothing is missed
+BLOOM_CAPACITY = 2_000_000
+BLOOM_ERROR_RATE = 0.01
+# New UIDs between saves of the filter (the rest is replayed from the buckets)
+BLOOM_SAVE_EVERY = 1000
+
+# Name this station reports under; set NFC_STATION_ID when several share a host
+STATION_ID = os.environ.get("NFC_STATION_ID") or socket.gethostname()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings."""
+
+    def __init__(self, capacity=BLOOM_CAPACITY, error_rate=BLOOM_ERROR_RATE, bits=None):
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self.positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(key))
+
+
+class UIDIndex:
+    """Exact on-disk set of issued tag UIDs with a Bloom filter in front.
+
+    UIDs are appended to one of ``UID_BUCKETS`` files picked by hash, so a
+    membership check reads at most one small file, and only when the Bloom
+    filter says the UID may be there; a UID never issued is answered from
+    memory. The filter is saved with the bucket sizes it covers, and on
+    load only the bucket tails written after that are replayed into it.
+    """
+
+    def __init__(self, directory=UID_INDEX_DIR):
+        self.directory = directory
+        self.bloom = None
+        self.unsaved = 0
+        self.lock = threading.Lock()
+
+    def bucket_path(self, bucket):
+        return os.path.join(self.directory, f"{bucket:02x}.txt")
+
+    def bucket_for(self, uid):
+        return zlib.crc32(uid.encode("utf-8")) % UID_BUCKETS
+
+    def bloom_path(self):
+        return os.path.join(self.directory, "bloom.bin")
+
+    def bucket_sizes(self):
+        sizes = {}
+        for bucket in range(UID_BUCKETS):
+            try:
+                sizes[bucket] = os.path.getsize(self.bucket_path(bucket))
+            except OSError:
+                sizes[bucket] = 0
+        return sizes
+
+    def load(self):
+        """Load the saved filter and catch it up with the buckets."""
+        os.makedirs(self.directory, exist_ok=True)
+        self.bloom = BloomFilter()
+        covered = {}
+        try:
+            with open(self.bloom_path(), "rb") as f:
+                header = json.loads(f.readline())
+                bits = bytearray(f.read())
+            if header["size"] == self.bloom.size and len(bits) == len(self.bloom.bits):
+                self.bloom.bits = bits
+                covered = {int(bucket): size for bucket, size in header["sizes"].items()}
+        except (OSError, ValueError, KeyError):
+            pass  # No usable filter; rebuild it from every bucket
+
+        for bucket in range(UID_BUCKETS):
+            try:
+                with open(self.bucket_path(bucket), "rb") as f:
+                    f.seek(covered.get(bucket, 0))
+                    for line in f:
+                        self.bloom.add(line.decode("utf-8").strip())
+            except OSError:
+                continue
+
+    def save(self):
+        """Write the filter and the bucket sizes it covers, atomically."""
+        with self.lock:
+            if self.bloom is None:
+                return
+            header = {"size": self.bloom.size, "sizes": self.bucket_sizes()}
+            try:
+                tmp_path = self.bloom_path() + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(json.dumps(header).encode("utf-8") + b"\n")
+                    f.write(self.bloom.bits)
+                os.replace(tmp_path, self.bloom_path())
+                self.unsaved = 0
+            except OSError as e:
+                print(f"Error saving UID index: {e}")
+
+    def ensure_loaded(self):
+        with self.lock:
+            if self.bloom is None:
+                self.load()
+
+    def contains(self, uid):
+        """Membership check for callers that hold ``lock`` with the filter loaded."""
+        if uid not in self.bloom:
+            return False
+        try:
+            with open(self.bucket_path(self.bucket_for(uid)), "r", encoding="utf-8") as f:
+                return any(line.strip() == uid for line in f)
+        except OSError:
+            return False
+
+    def __contains__(self, uid):
+        with self.lock:
+            if self.bloom is None:
+                self.load()
+            return self.contains(uid)
+
+    def add(self, uid):
+        with self.lock:
+            if self.bloom is None:
+                self.load()
+            # Checked under the same lock, so two adds can't both append the UID
+            if self.contains(uid):
+                return
+            with open(self.bucket_path(self.bucket_for(uid)), "a", encoding="utf-8") as f:
+                f.write(uid + "\n")
+            self.bloom.add(uid)
+            self.unsaved += 1
+            save = self.unsaved >= BLOOM_SAVE_EVERY
+        if save:
+            self.save()
+
+
+class WriteLog:
+    """Append-only JSONL audit log of tag operations.
+
+    One line per operation with the time, station, order id, tag UID, URL,
+    result (``"written"``, ``"failed"``, ``"timeout"`` or ``"already
+    written"``), whether the tag ended up holding the URL, and how long it
+    took, so the end-of-day report can count writes and throughput per
+    station.
+
+    ``record`` only queues the entry; a background thread appends queued
+    entries in batches and fsyncs each batch. The file is renamed aside
+    as ``write_log.000001.jsonl``, ``write_log.000002.jsonl``... when it
+    passes ``max_bytes`` and ``iter_entries`` reads the rotated files too.
+    Every UID that took a URL goes into a ``UIDIndex`` from the same
+    thread, so ``issued`` can warn before a tag is overwritten; UIDs still
+    in the queue count as issued too.
+    """
+
+    def __init__(self, path=WRITE_LOG_FILE, station=STATION_ID, max_bytes=MAX_LOG_BYTES, uid_index=None):
+        self.path = path
+        self.station = station
+        self.max_bytes = max_bytes
+        self.uids = uid_index if uid_index is not None else UIDIndex()
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        # UIDs recorded as written but not yet added to the index
+        self.pending_uids = set()
+
+    def record(self, order_id, uid, url, success, duration=None, result=None):
+        entry = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "station": self.station,
+            "order_id": order_id,
+            "uid": uid,
+            "url": url,
+            "success": bool(success),
+            "result": result or ("written" if success else "failed"),
+            "duration_ms": round(duration * 1000) if duration is not None else None,
+        }
+        issued = uid if success and uid else None
+        with self.lock:
+            if issued:
+                self.pending_uids.add(issued)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+        self.queue.put((json.dumps(entry) + "\n", issued))
+
+    def issued(self, uid):
+        """Whether a URL was ever written to this tag UID."""
+        with self.lock:
+            if uid in self.pending_uids:
+                return True
+        return uid in self.uids
+
+    def flush(self):
+        """Wait until every recorded entry is on disk."""
+        self.queue.join()
+
+    def run(self):
+        while True:
+            items = [self.queue.get()]
+            # Take whatever else is waiting, so a burst costs one fsync
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.writelines(line for line, _ in items)
+                    f.flush()
+                    os.fsync(f.fileno())
+            except OSError as e:
+                print(f"Error writing to the write log: {e}")
+            finally:
+                for _, uid in items:
+                    if uid:
+                        # The tag took the URL even if its log line didn't make it
+                        self.uids.add(uid)
+                        with self.lock:
+                            self.pending_uids.discard(uid)
+                    self.queue.task_done()
+
+    def rotated_files(self):
+        """``(sequence number, path)`` of the rotated files, oldest first."""
+        base, ext = os.path.splitext(self.path)
+        pattern = re.compile(re.escape(os.path.basename(base)) + r"\.(\d+)" + re.escape(ext) + "$")
+        files = []
+        for path in glob.glob(f"{glob.escape(base)}.*{ext}"):
+            match = pattern.match(os.path.basename(path))
+            if match:
+                files.append((int(match.group(1)), path))
+        return sorted(files)
+
+    def rotate(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        rotated = self.rotated_files()
+        sequence = rotated[-1][0] + 1 if rotated else 1
+        base, ext = os.path.splitext(self.path)
+        os.replace(self.path, f"{base}.{sequence:06d}{ext}")
+
+    def log_files(self):
+        """Rotated files oldest first, then the current one."""
+        return [path for _, path in self.rotated_files()] + [self.path]
+
+    def iter_entries(self, date=None):
+        """Yield logged operations, optionally only those on a date."""
+        if self.thread is not None:
+            self.flush()
+        for path in self.log_files():
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by a crash
+                    if date and not entry["time"].startswith(date):
+                        continue
+                    yield entry
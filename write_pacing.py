@@ -0,0 +1,103 @@
+import json
+import os
+import re
+import threading
+import time
+
+PACING_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "write_pacing.json")
+# Delay added after the first failure, and the most we ever wait between pages
+BACKOFF_STEP = 0.01
+MAX_DELAY = 0.2
+# Clean page writes in a row before the delay is halved
+RECOVERY_WRITES = 20
+
+
+def reader_model(name):
+    """The reader model from a PC/SC reader name, without its slot numbers.
+
+    ``"ACS ACR122U PICC Interface 00 00"`` and ``"... 01 00"`` are the
+    same model, so they share a profile.
+    """
+    return re.sub(r"(\s+\d+)+$", "", str(name)).strip() or "unknown"
+
+
+class WritePacer:
+    """Delay between page writes for one reader model.
+
+    Starts with back-to-back writes and only slows down when the reader
+    says so: each failed page doubles the delay (from ``BACKOFF_STEP`` up
+    to ``MAX_DELAY``), and every ``RECOVERY_WRITES`` clean writes in a row
+    halve it again until it is back to zero.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = min(max(delay, 0.0), MAX_DELAY)
+        self.clean_writes = 0
+        self.lock = threading.Lock()
+
+    def pace(self):
+        """Wait before the next page write."""
+        delay = self.delay
+        if delay:
+            time.sleep(delay)
+
+    def success(self):
+        with self.lock:
+            self.clean_writes += 1
+            if self.delay and self.clean_writes >= RECOVERY_WRITES:
+                self.clean_writes = 0
+                self.delay = self.delay / 2 if self.delay / 2 >= BACKOFF_STEP else 0.0
+
+    def failure(self):
+        with self.lock:
+            self.clean_writes = 0
+            self.delay = min(MAX_DELAY, max(BACKOFF_STEP, self.delay * 2))
+
+
+class PacingProfiles:
+    """Per reader model pacers, saved to disk so a station starts where it left off."""
+
+    def __init__(self, path=PACING_FILE):
+        self.path = path
+        self.pacers = None
+        self.saved = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                delays = json.load(f)
+        except (OSError, ValueError):
+            delays = {}
+        self.pacers = {model: WritePacer(delay) for model, delay in delays.items()}
+        self.saved = {model: pacer.delay for model, pacer in self.pacers.items()}
+
+    def pacer_for(self, reader_name):
+        """The shared pacer for a reader's model."""
+        model = reader_model(reader_name)
+        with self.lock:
+            if self.pacers is None:
+                self.load()
+            if model not in self.pacers:
+                self.pacers[model] = WritePacer()
+            return self.pacers[model]
+
+    def save(self):
+        """Write the profiles out if any delay changed since the last save."""
+        with self.lock:
+            if self.pacers is None:
+                return
+            delays = {model: pacer.delay for model, pacer in self.pacers.items()}
+            if delays == self.saved:
+                return
+            try:
+                tmp_path = self.path + ".tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(delays, f, indent=2)
+                os.replace(tmp_path, self.path)
+                self.saved = delays
+            except OSError as e:
+                print(f"Error saving write pacing: {e}")
+
+
+profiles = PacingProfiles()